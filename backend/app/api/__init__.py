@@ -4,8 +4,12 @@ from .support import router as support_router
 from .auth import router as auth_router
 from .users_me import router as user_me_router
 from .tour import router as tour_router
+from .geo import router as geo_router
+from .search import router as search_router
 from .review import router as review_router
 from .order import router as order_router
+from .hold import router as hold_router
+from .admin import router as admin_router
 
 router = APIRouter()
 
@@ -14,5 +18,9 @@ router.include_router(support_router)
 router.include_router(auth_router)
 router.include_router(user_me_router)
 router.include_router(tour_router)
+router.include_router(geo_router)
+router.include_router(search_router)
 router.include_router(review_router)
 router.include_router(order_router)
+router.include_router(hold_router)
+router.include_router(admin_router)
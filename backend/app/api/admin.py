@@ -0,0 +1,32 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+
+from app.database import session
+from app.export import MEDIA_TYPES, ExportFormat, stream_export
+from app.models import User
+from app.security import get_admin_user
+
+router = APIRouter()
+
+
+@router.get("/admin/export/{kind}")
+async def export(
+    kind: Literal["reviews", "tours"],
+    fmt: ExportFormat = Query("ndjson", alias="format"),
+    tour_id: str | None = Query(None, alias="tourId"),
+    _admin: User = Depends(get_admin_user),
+):
+    def body():
+        # своя сессия: генератор дочитывает курсор уже после выхода
+        # из обработчика
+        with session() as db:
+            yield from stream_export(db, kind, fmt, tour_id)
+
+    extension = "csv" if fmt == "csv" else "ndjson"
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{kind}.{extension}"'},
+    )
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from app.email_service import get_user_by_email, send_verification_email
+from app.email_service import enqueue_verification_email, get_user_by_email
 from app.security import create_access_token, get_password_hash, verify_password
 
 from app.schemas import UserProfile, RegisterRequest
@@ -22,8 +22,8 @@ async def register_user(data: RegisterRequest, db: Session = Depends(get_db)):
         existing.hashed_password = get_password_hash(data.password)  # pyright: ignore[reportAttributeAccessIssue]
         existing.first_name = data.first_name  # pyright: ignore[reportAttributeAccessIssue]
         existing.last_name = data.last_name  # pyright: ignore[reportAttributeAccessIssue]
+        enqueue_verification_email(db, existing)
         db.commit()
-        await send_verification_email(existing)
         return existing
 
     user = User(
@@ -34,11 +34,13 @@ async def register_user(data: RegisterRequest, db: Session = Depends(get_db)):
         is_active=False,
     )
     db.add(user)
+    db.flush()  # id пользователя нужен токену подтверждения
+
+    # пользователь, токен и письмо сохраняются одной транзакцией
+    enqueue_verification_email(db, user)
     db.commit()
     db.refresh(user)
 
-    await send_verification_email(user)
-
     return user
 
 @router.get("/verify_token", response_model=TokenResponse)
@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.api.tour import load_recommended_cards
+from app.database import get_db
+from app.geo import get_geo_index
+from app.responses import PreEncodedJSONResponse, dump_json
+from app.schemas.tour import GeoTourItem, GeoTours
+
+router = APIRouter()
+
+
+def build_geo_tours(
+    db: Session,
+    coords: dict[str, tuple[float, float]],
+    found: list[tuple[str, float]] | list[tuple[str, None]],
+) -> PreEncodedJSONResponse:
+    cards = load_recommended_cards(db)
+
+    items = GeoTours.model_construct(
+        root=[
+            GeoTourItem.model_construct(
+                id=tour_id,
+                **cards[tour_id],
+                lat=coords[tour_id][0],
+                long=coords[tour_id][1],
+                distanceKm=round(distance, 1) if distance is not None else None,
+            )
+            for tour_id, distance in found
+            if tour_id in cards
+        ]
+    )
+    return PreEncodedJSONResponse(content=dump_json(items))
+
+
+@router.get("/tours/nearby", response_model=GeoTours)
+async def get_nearby_tours(
+    tour_id: str | None = Query(None, alias="tourId"),
+    lat: float | None = Query(None, ge=-90, le=90),
+    long: float | None = Query(None, ge=-180, le=180),
+    k: int = Query(5, ge=1, le=50),
+    db: Session = Depends(get_db),
+):
+    index = get_geo_index(db)
+
+    if tour_id is not None:
+        if tour_id not in index.coords:
+            raise HTTPException(status_code=404, detail=f"Tour '{tour_id}' not found")
+        lat, long = index.coords[tour_id]
+    elif lat is None or long is None:
+        raise HTTPException(status_code=400, detail="Укажите tourId или lat и long")
+
+    found = index.nearest(lat, long, k, exclude=tour_id)
+    return build_geo_tours(db, index.coords, found)
+
+
+@router.get("/tours/bbox", response_model=GeoTours)
+async def get_tours_in_bbox(
+    south: float = Query(..., ge=-90, le=90),
+    west: float = Query(..., ge=-180, le=180),
+    north: float = Query(..., ge=-90, le=90),
+    east: float = Query(..., ge=-180, le=180),
+    db: Session = Depends(get_db),
+):
+    if south > north:
+        raise HTTPException(status_code=400, detail="south больше north")
+
+    index = get_geo_index(db)
+    found = [(tour_id, None) for tour_id in index.within(south, west, north, east)]
+    return build_geo_tours(db, index.coords, found)
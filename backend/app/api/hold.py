@@ -0,0 +1,67 @@
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.cache import invalidate_availability
+from app.database import get_db
+from app.holds import cancel_hold, create_hold, hold_sweeper
+from app.models import BookingDate, User
+from app.schemas.hold import SeatHoldCreate, SeatHoldResponse
+from app.security import get_current_user
+from app.seats import with_lock_retries
+
+router = APIRouter()
+
+
+@router.post("/holds", response_model=SeatHoldResponse, status_code=201)
+async def post_hold(
+    data: SeatHoldCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    booking_date = db.get(BookingDate, data.booking_date_id)
+    if not booking_date:
+        raise HTTPException(status_code=404, detail="Дата бронирования не найдена")
+    max_seats = booking_date.booking.max_seats
+    if data.seats > max_seats:
+        raise HTTPException(
+            status_code=400, detail=f"Можно забронировать не больше {max_seats} мест"
+        )
+    tour_id = str(booking_date.booking.tour_id)
+
+    # with_lock_retries ждёт блокировку через time.sleep — в пуле потоков
+    hold = await run_in_threadpool(
+        with_lock_retries,
+        db,
+        lambda: create_hold(
+            db, current_user.id, data.booking_date_id, data.seats  # pyright: ignore[reportArgumentType]
+        ),
+    )
+    if hold is None:
+        raise HTTPException(status_code=400, detail="Недостаточно свободных мест")
+
+    hold_sweeper.schedule(hold.id, hold.expires_at)  # pyright: ignore[reportArgumentType]
+    invalidate_availability(tour_id)
+
+    return SeatHoldResponse(
+        hold_id=hold.id,  # pyright: ignore[reportArgumentType]
+        booking_date_id=hold.booking_date_id,  # pyright: ignore[reportArgumentType]
+        seats=hold.seats,  # pyright: ignore[reportArgumentType]
+        expires_at=hold.expires_at,  # pyright: ignore[reportArgumentType]
+    )
+
+
+@router.delete("/holds/{hold_id}", status_code=204)
+async def delete_hold(
+    hold_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    cancelled = await run_in_threadpool(
+        with_lock_retries,
+        db,
+        lambda: cancel_hold(db, hold_id, current_user.id),  # pyright: ignore[reportArgumentType]
+    )
+    if not cancelled:
+        raise HTTPException(status_code=404, detail="Бронь не найдена")
+    return Response(status_code=204)
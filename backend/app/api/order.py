@@ -1,137 +1,286 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+import base64
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from sqlalchemy import func, select, tuple_
 from sqlalchemy.orm import Session, joinedload
 
+from app.cache import invalidate_availability
 from app.schemas import OrderResponse, OrderCreate, Orders
-from app.schemas.order import OrderSchema
-from app.models import User, Order, BookingDate
+from app.schemas.order import (
+    AdditionalTraveler,
+    AdditionalTravelers,
+    OrderSchema,
+    PrimaryTraveler,
+)
+from app.models import Booking, BookingDate, Order, Tour, User
 from app.database import get_db
 from app.security import get_current_user
-from app.email_service import generate_order_email_html, send_email_async
+from app.holds import take_hold
+from app.idempotency import (
+    claim_key,
+    complete_key,
+    release_key,
+    request_fingerprint,
+    wait_for_result,
+)
+from app.seats import release_seats, reserve_seats, with_lock_retries
+from app.email_service import generate_order_email_html
+from app.outbox import enqueue_email
+from app.responses import PreEncodedJSONResponse, dump_json
 from app.utils import format_date_range
 
-import json
-
 router = APIRouter()
 
 
-def create_order(db: Session, order_data: OrderCreate, current_user: User) -> Order:
+def order_email_html(
+    order: Order, booking_date: BookingDate, order_data: OrderCreate
+) -> str:
+    booking = booking_date.booking
+    return generate_order_email_html(
+        order_id=order.id,  # pyright: ignore[reportArgumentType]
+        tour_title=booking.tour.title,
+        tour_image_url=booking.tour.images[0],
+        date_range=format_date_range(
+            booking_date.start_date, booking_date.end_date  # pyright: ignore[reportArgumentType]
+        ),
+        days=booking.days,
+        participants_count=order.participants_count,  # pyright: ignore[reportArgumentType]
+        total_amount=order.total_amount,  # pyright: ignore[reportArgumentType]
+        prepayment_amount=order.prepayment_amount,  # pyright: ignore[reportArgumentType]
+        currency=booking.currency,
+        primary_traveler=order_data.primary_traveler,
+        additional_travelers=order_data.additional_travelers,
+    )
+
+
+def create_order(
+    db: Session,
+    order_data: OrderCreate,
+    current_user: User,
+    idempotency_key_id: int | None = None,
+) -> Order:
     # Проверяем существование даты бронирования
     booking_date = db.execute(
-        select(BookingDate).where(BookingDate.id == order_data.booking_date_id)
+        select(BookingDate)
+        .options(joinedload(BookingDate.booking).joinedload(Booking.tour))
+        .where(BookingDate.id == order_data.booking_date_id)
     ).scalar_one_or_none()
 
     if not booking_date:
         raise HTTPException(status_code=404, detail="Дата бронирования не найдена")
 
-    if not bool(booking_date.active):
-        raise HTTPException(
-            status_code=400, detail="Эта дата недоступна для бронирования"
+    booking = booking_date.booking
+    tour_id = str(booking.tour_id)
+    count = order_data.participants_count
+
+    def transaction() -> Order:
+        # места под бронь уже списаны — докупаем или возвращаем разницу
+        held = 0
+        if order_data.hold_id is not None:
+            held = take_hold(
+                db, order_data.hold_id, current_user.id, booking_date.id  # pyright: ignore[reportArgumentType]
+            )
+
+        if count > held and not reserve_seats(db, booking_date.id, count - held):  # pyright: ignore[reportArgumentType]
+            db.rollback()
+            raise HTTPException(status_code=400, detail="Недостаточно свободных мест")
+        if count < held:
+            release_seats(db, booking_date.id, held - count)  # pyright: ignore[reportArgumentType]
+
+        order = Order(
+            user_id=current_user.id,
+            tour_id=order_data.tour_id,
+            booking_date_id=booking_date.id,
+            participants_count=count,
+            total_amount=booking_date.price * count,
+            currency=booking.currency,
+            prepayment_amount=booking.prepayment * count,
+            # в JSON-колонку кладём сами данные, а не строку с JSON
+            primary_traveler=order_data.primary_traveler.model_dump(mode="json"),
+            additional_travelers=order_data.additional_travelers.model_dump(mode="json")
+            if order_data.additional_travelers
+            else None,
         )
 
-    if bool(booking_date.seats < order_data.participants_count):
-        raise HTTPException(status_code=400, detail="Недостаточно свободных мест")
-
-    order = Order(
-        user_id=current_user.id,
-        tour_id=order_data.tour_id,
-        booking_date_id=booking_date.id,
-        participants_count=order_data.participants_count,
-        total_amount=booking_date.price * order_data.participants_count,
-        currency=booking_date.booking.currency,
-        prepayment_amount=booking_date.booking.prepayment
-        * order_data.participants_count,
-        primary_traveler=order_data.primary_traveler.model_dump_json(),
-        additional_travelers=order_data.additional_travelers.model_dump_json()
-        if order_data.additional_travelers
-        else None,
-    )
+        db.add(order)
+        db.flush()  # номер заказа нужен письму
 
-    booking_date.seats -= order_data.participants_count  # pyright: ignore[reportAttributeAccessIssue]
+        # письмо уходит через outbox: сохраняется вместе с заказом,
+        # отправляет его воркер, а не этот запрос
+        enqueue_email(
+            db,
+            str(current_user.email),
+            f"Покупка тура №{order.id}",
+            order_email_html(order, booking_date, order_data),
+        )
+
+        # ответ для повторов с тем же ключом — в той же транзакции
+        if idempotency_key_id is not None:
+            complete_key(db, idempotency_key_id, 200, {"order_id": order.id})
+
+        db.commit()
+        return order
 
-    db.add(order)
-    db.commit()
+    order = with_lock_retries(db, transaction)
     db.refresh(order)
 
+    # число мест изменилось — сбрасываем кэш доступности дат тура
+    invalidate_availability(tour_id)
+
     return order
 
 
+def encode_order_cursor(created_at: datetime, order_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{order_id}".encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_order_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, order_id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(order_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.get("/orders", response_model=Orders)
 async def my_orders(
+    cursor: str | None = Query(None),
+    limit: int = Query(20, ge=1, le=100),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    orders = (
-        db.query(Order)
+    # только нужные колонки: заказ, название и первое фото тура, дата
+    query = (
+        db.query(
+            Order.id,
+            Order.user_id,
+            Order.tour_id,
+            Order.booking_date_id,
+            Order.participants_count,
+            Order.total_amount,
+            Order.currency,
+            Order.prepayment_amount,
+            Order.primary_traveler,
+            Order.additional_travelers,
+            Order.created_at,
+            Tour.title.label("tour_title"),
+            func.json_extract(Tour.images, "$[0]").label("tour_img"),
+            BookingDate.start_date,
+            Booking.days,
+        )
+        .outerjoin(Tour, Tour.id == Order.tour_id)
+        .outerjoin(BookingDate, BookingDate.id == Order.booking_date_id)
+        .outerjoin(Booking, Booking.id == BookingDate.booking_id)
         .filter(Order.user_id == current_user.id)
-        .options(
-            joinedload(Order.user),
-            joinedload(Order.tour),
-            joinedload(Order.booking_date),
+    )
+    if cursor:
+        query = query.filter(
+            tuple_(Order.created_at, Order.id) < decode_order_cursor(cursor)
         )
-        .order_by(Order.created_at.desc())
+
+    # keyset по (created_at, id): берём на одну запись больше
+    rows = (
+        query.order_by(Order.created_at.desc(), Order.id.desc())
+        .limit(limit + 1)
         .all()
     )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
 
+    # путешественники провалидированы при создании заказа и лежат в БД
+    # готовым JSON — собираем модели без повторного разбора и валидации
     order_schemas = []
-    for order in orders:
-        # Парсим primary_traveler из JSON-строки в dict
-        primary_traveler = order.primary_traveler
-        if isinstance(primary_traveler, str):
-            primary_traveler = json.loads(primary_traveler)
-
-        # Парсим additional_travelers из JSON-строки в list
-        additional_travelers = order.additional_travelers
-        if isinstance(additional_travelers, str):
-            if additional_travelers and additional_travelers != "[]":  # pyright: ignore[reportGeneralTypeIssues]
-                additional_travelers = json.loads(additional_travelers)
-            else:
-                additional_travelers = None  # или [] если хотите пустой список
+    for r in rows:
+        date_range = ""
+        if r.start_date is not None:
+            date_range = format_date_range(
+                r.start_date, r.start_date + timedelta(days=r.days - 1)
+            )
 
         order_schemas.append(
-            OrderSchema(
-                id=order.id,  # pyright: ignore[reportArgumentType]
-                user_id=order.user_id,  # pyright: ignore[reportArgumentType]
-                tour_id=order.tour_id,  # pyright: ignore[reportArgumentType]
-                booking_date_id=order.booking_date_id,  # pyright: ignore[reportArgumentType]
-                participants_count=order.participants_count,  # pyright: ignore[reportArgumentType]
-                total_amount=order.total_amount,  # pyright: ignore[reportArgumentType]
-                currency=order.currency,  # pyright: ignore[reportArgumentType]
-                prepayment_amount=order.prepayment_amount,  # pyright: ignore[reportArgumentType]
-                primary_traveler=primary_traveler,  # pyright: ignore[reportArgumentType]
-                additional_travelers=additional_travelers,  # pyright: ignore[reportArgumentType]
+            OrderSchema.model_construct(
+                id=r.id,
+                user_id=r.user_id,
+                tour_id=r.tour_id,
+                booking_date_id=r.booking_date_id,
+                participants_count=r.participants_count,
+                total_amount=r.total_amount,
+                currency=r.currency,
+                prepayment_amount=r.prepayment_amount,
+                primary_traveler=PrimaryTraveler.model_construct(
+                    **r.primary_traveler
+                ),
+                additional_travelers=AdditionalTravelers.model_construct(
+                    root=[
+                        AdditionalTraveler.model_construct(**t)
+                        for t in r.additional_travelers
+                    ]
+                )
+                if r.additional_travelers
+                else None,
+                created_at=r.created_at,
+                tour_title=r.tour_title or "",
+                tour_img=r.tour_img or "",
+                date_range=date_range,
             )
         )
 
-    return Orders(root=order_schemas)
+    last = rows[-1] if rows else None
+    orders = Orders.model_construct(
+        items=order_schemas,
+        nextCursor=encode_order_cursor(last.created_at, last.id)
+        if has_more and last
+        else None,
+    )
+    # dob и gender лежат в JSON строками — сериализуются как есть,
+    # предупреждения о типах при этом не нужны
+    return PreEncodedJSONResponse(content=dump_json(orders, warnings=False))
 
 
 @router.post("/orders", response_model=OrderResponse)
 async def post_order(
     data: OrderCreate,
+    idempotency_key: str | None = Header(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    order = create_order(db, data, current_user)
+    # create_order ждёт блокировку SQLite через time.sleep (with_lock_retries) —
+    # в пуле потоков, чтобы не останавливать цикл событий
+    if idempotency_key is None:
+        order = await run_in_threadpool(create_order, db, data, current_user)
+        return OrderResponse(order_id=order.id)  # pyright: ignore[reportArgumentType]
 
-    email_html = generate_order_email_html(
-        order_id=order.id,  # pyright: ignore[reportArgumentType]
-        tour_title=order.tour.title,
-        tour_image_url=order.tour.images[0],
-        date_range=format_date_range(
-            order.booking_date.start_date, order.booking_date.end_date
-        ),
-        days=order.booking_date.booking.days,
-        participants_count=order.participants_count,  # pyright: ignore[reportArgumentType]
-        total_amount=order.total_amount,  # pyright: ignore[reportArgumentType]
-        prepayment_amount=order.prepayment_amount,  # pyright: ignore[reportArgumentType]
-        currency=order.booking_date.booking.currency,
-        primary_traveler=data.primary_traveler,  # pyright: ignore[reportArgumentType]
-        additional_travelers=data.additional_travelers,  # pyright: ignore[reportArgumentType]
-    )
+    user_id: int = current_user.id  # pyright: ignore[reportAssignmentType]
+    fingerprint = request_fingerprint(data)
 
-    await send_email_async(
-        str(current_user.email), f"Покупка тура №{order.id}", email_html
-    )
+    while (key_id := claim_key(db, user_id, idempotency_key, fingerprint)) is None:
+        # ключ уже занят: ждём первый запрос и отдаём его ответ
+        stored = await wait_for_result(db, user_id, idempotency_key)
+        if stored is None:
+            continue  # первый запрос завершился без результата — ключ свободен
+        if stored.fingerprint != fingerprint:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key уже использован с другими данными заказа",
+            )
+        return JSONResponse(
+            stored.response,
+            status_code=stored.status_code,
+            headers={"Idempotent-Replayed": "true"},
+        )
+
+    try:
+        order = await run_in_threadpool(
+            create_order, db, data, current_user, idempotency_key_id=key_id
+        )
+    except Exception:
+        # заказ не создан — повтор с тем же ключом выполнится заново
+        release_key(db, key_id)
+        raise
 
     return OrderResponse(order_id=order.id)  # pyright: ignore[reportArgumentType]
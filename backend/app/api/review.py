@@ -1,47 +1,221 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+import base64
+from datetime import date, timedelta
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Header, Query, HTTPException, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from app.models.review import Review
-from app.schemas.review import ReviewsSchema, ReviewItem
+from sqlalchemy import desc, func, literal_column, tuple_
+from app.models import Booking, BookingDate, Order, User
+from app.models.review import DETAILED_MIN_LENGTH, Review
+from app.schemas.review import ReviewCreate, ReviewsSchema, ReviewItem
 from app.database import get_db
+from app.review_buffer import review_buffer
+from app.security import get_current_user
+from app.responses import dump_json
+from app.cache import get_review_page, reviews_version, set_review_page
+from app.compression import (
+    DYNAMIC_BROTLI_QUALITY,
+    choose_encoding,
+    compress_variants,
+    encoded_response,
+    matching_etag,
+    variant_etag,
+)
 
 router = APIRouter()
 
+
+# Ключ сортировки -> (колонки keyset, по убыванию). Колонки идут в одном
+# направлении, поэтому курсор сравнивается одним row value, а порядок
+# совпадает с индексом (см. app/models/review.py)
+REVIEW_SORTS = {
+    "newest": ((Review.date, Review.id), True),
+    "oldest": ((Review.date, Review.id), False),
+    "highest": ((Review.rating, Review.date, Review.id), True),
+    "lowest": ((Review.rating, Review.date, Review.id), False),
+}
+
+ReviewSort = Literal["newest", "oldest", "highest", "lowest"]
+
+# литерал, а не параметр: иначе SQLite не выберет частичный индекс
+DETAILED_FILTER = func.length(Review.text) >= literal_column(str(DETAILED_MIN_LENGTH))
+
+
+def encode_cursor(values: list) -> str:
+    raw = "|".join(v.isoformat() if isinstance(v, date) else str(v) for v in values)
+    return base64.urlsafe_b64encode(raw.encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, columns) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        parts = raw.split("|")
+        if len(parts) != len(columns):
+            raise ValueError(cursor)
+        return tuple(
+            date.fromisoformat(part) if column is Review.date else int(part)
+            for part, column in zip(parts, columns)
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def build_reviews_page(
+    db: Session,
+    tour_id: str,
+    page: int,
+    per_page: int,
+    cursor: str | None,
+    stars: int | None = None,
+    sort: ReviewSort = "newest",
+    detailed: bool = False,
+) -> bytes | None:
+    columns, descending = REVIEW_SORTS[sort]
+
+    query = db.query(Review).filter(Review.tour_id == tour_id)
+    if stars is not None:
+        query = query.filter(Review.rating == stars)
+        # рейтинг зафиксирован: порядок и курсор — по (date, id), тогда
+        # индекс (tour_id, rating, date, id) даёт и сортировку, и диапазон
+        columns = columns[-2:]
+    if detailed:
+        query = query.filter(DETAILED_FILTER)
+
+    query = query.order_by(*(desc(c) if descending else c for c in columns))
+
+    if cursor is not None:
+        # keyset: продолжаем строго после последнего отзыва прошлой страницы
+        position = tuple_(*columns)
+        after = decode_cursor(cursor, columns)
+        query = query.filter(position < after if descending else position > after)
+    else:
+        query = query.offset((page - 1) * per_page)
+
+    # лишняя запись показывает, есть ли продолжение, — без COUNT(*)
+    reviews = query.limit(per_page + 1).all()
+
+    filtered = stars is not None or detailed
+    if not reviews and cursor is None and page == 1 and not filtered:
+        return None
+
+    has_more = len(reviews) > per_page
+    reviews = reviews[:per_page]
+
+    reviews_list = [
+        ReviewItem.model_construct(
+            id=r.id,
+            name=r.name,
+            date=r.date.strftime("%d.%m.%Y"),
+            rating=r.rating,
+            text=r.text
+        )
+        for r in reviews
+    ]
+
+    next_cursor = None
+    if has_more:
+        last = reviews[-1]
+        next_cursor = encode_cursor([getattr(last, c.key) for c in columns])
+
+    reviews_page = ReviewsSchema.model_construct(
+        reviews=reviews_list, hasMore=has_more, nextCursor=next_cursor
+    )
+    return dump_json(reviews_page)
+
+
 @router.get("/reviews", response_model=ReviewsSchema)
 async def get_reviews(
     tour_id: str = Query(..., alias="tourId"),
     page: int = Query(1, ge=1),
     per_page: int = Query(10, ge=1),
+    cursor: str | None = Query(None),
+    stars: int | None = Query(None, ge=1, le=5),
+    sort: ReviewSort = Query("newest"),
+    detailed: bool = Query(False),
+    if_none_match: str | None = Header(None),
+    accept_encoding: str | None = Header(None),
     db: Session = Depends(get_db)
 ):
-    total_reviews = db.query(Review).filter(Review.tour_id == tour_id).count()
-    
-    if total_reviews == 0:
-        raise HTTPException(status_code=404, detail=f"No reviews found for tour '{tour_id}'")
-    
-    offset = (page - 1) * per_page
-    
-    reviews = (
-        db.query(Review)
-        .filter(Review.tour_id == tour_id)
-        .order_by(desc(Review.date))
-        .offset(offset)
-        .limit(per_page)
+    # ETag строится из версии отзывов тура — без обращения к БД
+    version = reviews_version(tour_id)
+    position = cursor if cursor is not None else page
+    etag = f'"{version}-{stars or 0}-{sort}-{int(detailed)}-{position}-{per_page}"'
+    headers = {"Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+
+    matched = matching_etag(if_none_match, etag)
+    if matched:
+        return Response(status_code=304, headers={**headers, "ETag": matched})
+
+    key = (tour_id, stars, sort, detailed, position, per_page)
+    cached = get_review_page(key, version)
+
+    if cached is None:
+        body = build_reviews_page(
+            db, tour_id, page, per_page, cursor, stars, sort, detailed
+        )
+        if body is None:
+            raise HTTPException(status_code=404, detail=f"No reviews found for tour '{tour_id}'")
+        variants = compress_variants(body, DYNAMIC_BROTLI_QUALITY)
+        set_review_page(key, version, body, variants)
+    else:
+        body, variants = cached
+
+    encoding = choose_encoding(accept_encoding, variants)
+    headers["ETag"] = variant_etag(etag, encoding)
+    return encoded_response(body, variants, encoding, headers)
+
+
+def has_completed_order(db: Session, user_id: int, tour_id: str) -> bool:
+    """
+    Есть ли у пользователя заказ на тур, который уже закончился
+    """
+    dates = (
+        db.query(BookingDate.start_date, Booking.days)
+        .select_from(Order)
+        .join(BookingDate, BookingDate.id == Order.booking_date_id)
+        .join(Booking, Booking.id == BookingDate.booking_id)
+        .filter(Order.user_id == user_id, Order.tour_id == tour_id)
         .all()
     )
-    
-    reviews_list = [
-        ReviewItem(
-            id=r.id,  # pyright: ignore[reportArgumentType]
-            name=r.name,  # pyright: ignore[reportArgumentType]
-            date=r.date.strftime("%d.%m.%Y"),
-            rating=r.rating,  # pyright: ignore[reportArgumentType]
-            text=r.text  # pyright: ignore[reportArgumentType]
+    today = date.today()
+    return any(start + timedelta(days=days - 1) < today for start, days in dates)
+
+
+@router.post("/reviews", status_code=202)
+async def post_review(
+    data: ReviewCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    user_id: int = current_user.id  # pyright: ignore[reportAssignmentType]
+
+    if not has_completed_order(db, user_id, data.tourId):
+        raise HTTPException(
+            status_code=403,
+            detail="Отзыв можно оставить только после завершения купленного тура",
         )
-        for r in reviews
-    ]
-    
-    # Проверяем, есть ли еще отзывы после текущей страницы
-    has_more = (offset + len(reviews_list)) < total_reviews
-    
-    return ReviewsSchema(reviews=reviews_list, hasMore=has_more)
\ No newline at end of file
+
+    already_reviewed = review_buffer.is_pending(data.tourId, user_id) or (
+        db.query(Review.id)
+        .filter(Review.tour_id == data.tourId, Review.user_id == user_id)
+        .first()
+        is not None
+    )
+    if already_reviewed:
+        raise HTTPException(status_code=409, detail="Вы уже оставили отзыв на этот тур")
+
+    name = f"{current_user.first_name or ''} {current_user.last_name or ''}".strip()
+
+    # запись в БД — пачкой при сбросе буфера
+    review_buffer.add(
+        {
+            "tour_id": data.tourId,
+            "user_id": user_id,
+            "name": name or str(current_user.email).split("@")[0],
+            "date": date.today(),
+            "rating": data.rating,
+            "text": data.text,
+        }
+    )
+
+    return {"status": "accepted", "message": "Спасибо! Отзыв появится в течение пары секунд"}
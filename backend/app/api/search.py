@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.api.tour import load_recommended_cards
+from app.database import get_db
+from app.responses import PreEncodedJSONResponse, dump_json
+from app.schemas.tour import SearchTourItem, SearchTours
+from app.search import search_tours
+
+router = APIRouter()
+
+
+@router.get("/tours/search", response_model=SearchTours)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    cards = load_recommended_cards(db)
+
+    results = SearchTours.model_construct(
+        root=[
+            SearchTourItem.model_construct(id=tour_id, **cards[tour_id])
+            for tour_id, _ in search_tours(db, q, limit)
+            if tour_id in cards
+        ]
+    )
+    return PreEncodedJSONResponse(content=dump_json(results))
@@ -1,18 +1,17 @@
 from datetime import datetime, timedelta
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.schemas import SubscribeRequest
 
 from app.models import Subscriber
 from app.database import get_db
-from app.email_service import send_all_emails_async
+from app.email_service import enqueue_welcome_emails
 
 router = APIRouter()
 
 @router.post("/subscribe")
 async def subscribe(
     data: SubscribeRequest,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
 ):
     if data.hp:
@@ -39,10 +38,10 @@ async def subscribe(
         )
         db.add(new_sub)
 
+    # письма админу и подписчику сохраняются вместе с подпиской
+    enqueue_welcome_emails(db, data.name, data.email)
     db.commit()
 
-    background_tasks.add_task(send_all_emails_async, data.name, data.email)
-
     return {
         "status": "success",
         "message": "Подписка успешно оформлена!",
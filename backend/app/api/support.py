@@ -1,11 +1,12 @@
 
-from fastapi import APIRouter, BackgroundTasks, Depends
+from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.schemas import SupportRequest
 from app.models import SupportMessage
-from app.email_service import build_html_support, send_email_async
+from app.email_service import build_html_support
+from app.outbox import enqueue_email
 from app.config import Settings, get_settings
 
 router = APIRouter()
@@ -13,7 +14,6 @@ router = APIRouter()
 @router.post("/support")
 async def support_form(
     data: SupportRequest,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     settings: Settings = Depends(get_settings)
 ):
@@ -26,9 +26,8 @@ async def support_form(
         message=data.message,
     )
     db.add(support_entry)
-    db.commit()
 
-    # Письмо админу
+    # Письмо админу — в outbox, той же транзакцией, что и обращение
     html = build_html_support(
         data.name,
         data.email,
@@ -37,12 +36,13 @@ async def support_form(
         data.message,
     )
 
-    background_tasks.add_task(
-        send_email_async,
+    enqueue_email(
+        db,
         settings.SMTP.ADMIN,
         "📩 Новое сообщение в поддержку KazWonder",
         html,
     )
+    db.commit()
 
     return {"status": "success", "message": "Ваше сообщение отправлено!"}
 
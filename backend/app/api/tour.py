@@ -1,36 +1,174 @@
-from datetime import date
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from datetime import date, timedelta
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from sqlalchemy.orm import Session, joinedload, load_only, undefer_group
 
-from app.schemas.tour import TourSchema
+from app.cache import (
+    availability_version,
+    cards_version,
+    get_availability,
+    get_recommended_cards,
+    get_tour_document,
+    set_availability,
+    set_recommended_cards,
+    set_tour_document,
+    tour_version,
+)
+from app.schemas.tour import (
+    BookingDateItem,
+    Organizer,
+    TourAvailability,
+    TourCatalog,
+    TourCatalogItem,
+    TourSchema,
+)
 from app.database import get_db
+from app.responses import PreEncodedJSONResponse, dump_json
 from app.models.tour import Tour
-from app.utils import format_date_range, get_rating_summary
-from app.models.booking import BookingDate
+from app.compression import (
+    choose_encoding,
+    compress_variants,
+    encoded_response,
+    matching_etag,
+    variant_etag,
+)
+from app.utils import (
+    format_date_range,
+    get_rating_summaries,
+    get_rating_summary,
+    make_etag,
+)
+from app.models.booking import Booking, BookingDate
+from app.models.recommendation import TourRecommendation
+from app.recommend import RECOMMENDATIONS_K
 
 
 router = APIRouter()
 
 
-@router.get("/tours", response_model=TourSchema)
-async def get_tour(
-    tour_id: str = Query(..., alias="tourId"), db: Session = Depends(get_db)
-):
+# Поле каталога -> колонки Tour и Booking, которые нужно прочитать
+CATALOG_FIELDS = {
+    "title": ([Tour.title], []),
+    "img": ([Tour.images], []),
+    "images": ([Tour.images], []),
+    "description": ([Tour.description], []),
+    "organizer": ([Tour.organizer], []),
+    "map": ([Tour.map_popup, Tour.map_lat, Tour.map_long], []),
+    "price": ([], [Booking.cost]),
+    "currency": ([], [Booking.currency]),
+    "days": ([], [Booking.days]),
+}
+
+DEFAULT_CATALOG_FIELDS = ("title", "img", "price", "currency", "days")
+
+
+def load_recommended_cards(db: Session) -> dict[str, dict]:
+    """
+    Возвращает индекс карточек всех туров, при необходимости строит его
+    одним запросом только по нужным колонкам и одним — по рейтингам.
+    Индекс сбрасывается по счётчикам каталога и отзывов в базе
+    (app/cache_versions.py), в том числе после загрузки из json_db.
+    """
+    cards = get_recommended_cards()
+    if cards is not None:
+        return cards
+
+    version = cards_version()
+    rows = (
+        db.query(
+            Tour.id, Tour.title, Tour.images, Booking.cost, Booking.currency
+        )
+        .outerjoin(Booking, Booking.tour_id == Tour.id)
+        .all()
+    )
+    summaries = get_rating_summaries(db, (id for id, *_ in rows))
+    cards = {
+        id: {
+            "url": f"/tours/{id}",
+            "title": title,
+            "img": images[0] if images else "",
+            "price": cost or 0,
+            "currency": currency or "",
+            "rating": summaries[id]["average"],
+            "reviewCount": summaries[id]["totalReviews"],
+        }
+        for id, title, images, cost, currency in rows
+    }
+    # пустой каталог не кэшируем: его загружают отдельным процессом,
+    # и первый запрос не должен закрепить пустой индекс
+    if cards:
+        set_recommended_cards(cards, version)
+
+    return cards
+
+
+def load_tour_aggregate(db: Session, tour_id: str) -> Tour | None:
+    """
+    Загружает тур вместе с booking одним запросом (JOIN).
+    Даты и места в документ тура не входят — см. get_tour_availability.
+    """
+    return (
+        db.query(Tour)
+        .options(undefer_group("content"), joinedload(Tour.booking))
+        .filter(Tour.id == tour_id)
+        .first()
+    )
+
+
+def build_availability(db: Session, tour_id: str) -> bytes | None:
+    """
+    Будущие активные даты тура одним запросом: booking + booking_dates
+    """
+    rows = (
+        db.query(
+            Booking.days,
+            BookingDate.id,
+            BookingDate.start_date,
+            BookingDate.price,
+            BookingDate.seats,
+        )
+        .select_from(Booking)
+        .outerjoin(
+            BookingDate,
+            (BookingDate.booking_id == Booking.id)
+            & (BookingDate.active == True)  # noqa: E712
+            & (BookingDate.start_date >= date.today()),
+        )
+        .filter(Booking.tour_id == tour_id)
+        .order_by(BookingDate.start_date)
+        .all()
+    )
+    if not rows:
+        return None
+
+    availability = TourAvailability.model_construct(
+        dates=[
+            BookingDateItem.model_construct(
+                id=id,
+                range=format_date_range(
+                    start_date, start_date + timedelta(days=days - 1)
+                ),
+                price=price,
+                seats=seats,
+                active=seats > 0,
+            )
+            for days, id, start_date, price, seats in rows
+            if id is not None
+        ]
+    )
+    return dump_json(availability)
+
+
+def build_tour_document(db: Session, tour_id: str) -> bytes | None:
+    """
+    Собирает полный документ тура и сериализует его в JSON
+    """
     # ---------- проверка существования ----------
-    tour = db.query(Tour).filter(Tour.id == tour_id).first()
+    tour = load_tour_aggregate(db, tour_id)
     if not tour:
-        raise HTTPException(status_code=404, detail=f"Tour '{tour_id}' not found")
+        return None
 
     # ---------- booking ----------
     booking = tour.booking
-    
-    booking_dates = (
-        db.query(BookingDate)
-        .filter(BookingDate.booking_id == booking.id)
-        .filter(BookingDate.active == True)  # noqa: E712
-        .filter(BookingDate.start_date >= date.today())
-        .all()
-    )
 
     booking_json = {
         "cost": booking.cost,
@@ -38,33 +176,26 @@ async def get_tour(
         "days": booking.days,
         "prepayment": booking.prepayment,
         "maxSeats": booking.max_seats,
-        "dates": [
-            {
-                "id": d.id,
-                "range": format_date_range(d.start_date, d.end_date),  # pyright: ignore[reportArgumentType]
-                "price": d.price,
-                "seats": d.seats,
-                "active": d.active,
-            }
-            for d in booking_dates
-        ],
     }
 
     # ---------- reviews ----------
     rating_summary = get_rating_summary(db, str(tour.id))
 
     # ---------- recommendedCards ----------
-    other_tours = db.query(Tour).filter(Tour.id != tour.id).all()
-    recommended_cards = [
-        {
-            "url": f"/tours/{t.id}",
-            "title": t.title,
-            "img": t.images[0] if bool(t.images) else "",
-            "price": t.booking.cost if t.booking else 0,
-            "currency": t.booking.currency if t.booking else "",
-        }
-        for t in other_tours
+    cards = load_recommended_cards(db)
+    recommended_ids = [
+        recommended_id
+        for (recommended_id,) in db.query(TourRecommendation.recommended_id)
+        .filter(TourRecommendation.tour_id == tour.id)
+        .order_by(TourRecommendation.position)
     ]
+    if not recommended_ids:
+        # пакетная задача ещё не запускалась — первые k туров каталога
+        recommended_ids = [
+            card_tour_id for card_tour_id in cards if card_tour_id != tour.id
+        ][:RECOMMENDATIONS_K]
+
+    recommended_cards = [cards[i] for i in recommended_ids if i in cards]
 
     # ---------- формирование данных ----------
     tour_dict = {
@@ -88,4 +219,125 @@ async def get_tour(
     }
 
     # ---------- Pydantic валидация ----------
-    return TourSchema(**tour_dict)
+    # единственная валидация: дальше документ отдаётся из кэша байтами
+    return dump_json(TourSchema(**tour_dict))
+
+
+@router.get("/tours", response_model=TourSchema)
+async def get_tour(
+    tour_id: str = Query(..., alias="tourId"),
+    if_none_match: str | None = Header(None),
+    accept_encoding: str | None = Header(None),
+    db: Session = Depends(get_db),
+):
+    cached = get_tour_document(tour_id)
+
+    if cached is None:
+        version = tour_version(tour_id)
+        body = build_tour_document(db, tour_id)
+        if body is None:
+            raise HTTPException(status_code=404, detail=f"Tour '{tour_id}' not found")
+        etag = make_etag(body)
+        # сжимаем один раз при сборке, а не на каждый запрос
+        variants = compress_variants(body)
+        set_tour_document(tour_id, body, etag, variants, version)
+    else:
+        body, etag, variants = cached
+
+    # в документе рейтинги, они меняются с каждым сбросом буфера отзывов:
+    # клиент хранит копию, но перепроверяет её по ETag (обычно 304)
+    headers = {"Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+
+    matched = matching_etag(if_none_match, etag)
+    if matched:
+        return Response(status_code=304, headers={**headers, "ETag": matched})
+
+    encoding = choose_encoding(accept_encoding, variants)
+    headers["ETag"] = variant_etag(etag, encoding)
+    return encoded_response(body, variants, encoding, headers)
+
+
+@router.get("/tours/availability", response_model=TourAvailability)
+async def get_tour_availability(
+    tour_id: str = Query(..., alias="tourId"), db: Session = Depends(get_db)
+):
+    body = get_availability(tour_id)
+
+    if body is None:
+        version = availability_version(tour_id)
+        body = build_availability(db, tour_id)
+        if body is None:
+            raise HTTPException(status_code=404, detail=f"Tour '{tour_id}' not found")
+        set_availability(tour_id, body, version)
+
+    return PreEncodedJSONResponse(
+        content=body, headers={"Cache-Control": "no-cache"}
+    )
+
+
+@router.get("/tours/catalog", response_model=TourCatalog)
+async def get_tour_catalog(
+    cursor: str | None = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    fields: str | None = Query(None),
+    db: Session = Depends(get_db),
+):
+    requested = (
+        [f.strip() for f in fields.split(",") if f.strip()]
+        if fields
+        else list(DEFAULT_CATALOG_FIELDS)
+    )
+    unknown = [f for f in requested if f not in CATALOG_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+
+    tour_columns = [Tour.id]
+    booking_columns = []
+    for f in requested:
+        tour_cols, booking_cols = CATALOG_FIELDS[f]
+        tour_columns += tour_cols
+        booking_columns += booking_cols
+
+    query = db.query(Tour).options(load_only(*tour_columns))  # pyright: ignore[reportArgumentType]
+    if booking_columns:
+        query = query.options(
+            joinedload(Tour.booking).load_only(*booking_columns)
+        )
+    if cursor:
+        query = query.filter(Tour.id > cursor)
+
+    # keyset: берём на одну запись больше, чтобы понять, есть ли продолжение
+    tours = query.order_by(Tour.id).limit(limit + 1).all()
+    has_more = len(tours) > limit
+    tours = tours[:limit]
+
+    items = []
+    for t in tours:
+        values = {}
+        booking = t.booking if booking_columns else None
+        for f in requested:
+            if f == "img":
+                values[f] = t.images[0] if bool(t.images) else ""
+            elif f == "organizer":
+                # вложенная модель тоже собирается без валидации, иначе
+                # сериализатор предупреждает о dict вместо Organizer
+                values[f] = (
+                    Organizer.model_construct(**t.organizer) if t.organizer else None
+                )
+            elif f == "map":
+                values[f] = {"popup": t.map_popup, "lat": t.map_lat, "long": t.map_long}
+            elif f == "price":
+                values[f] = booking.cost if booking else 0
+            elif f in ("currency", "days"):
+                values[f] = getattr(booking, f) if booking else None
+            else:
+                values[f] = getattr(t, f)
+        items.append(TourCatalogItem.model_construct(id=t.id, **values))
+
+    catalog = TourCatalog.model_construct(
+        items=items,
+        nextCursor=str(tours[-1].id) if has_more else None,
+    )
+    return PreEncodedJSONResponse(content=dump_json(catalog, exclude_unset=True))
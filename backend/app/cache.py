@@ -0,0 +1,189 @@
+from collections import OrderedDict
+from threading import Lock
+import time
+import uuid
+
+# Идентификатор процесса: версии ниже живут в памяти и обнуляются при
+# перезапуске, поэтому ETag на их основе включает этот идентификатор.
+INSTANCE_ID = uuid.uuid4().hex[:8]
+
+# Кэш готовых документов тура: tour_id -> (JSON-байты, ETag, сжатые варианты).
+# Документ статичен: места по датам отдаются отдельно (см. ниже).
+_tour_documents: dict[str, tuple[bytes, str, dict[str, bytes]]] = {}
+
+# LRU страниц отзывов: (tour_id, фильтры, сортировка, page или cursor,
+# per_page) -> (версия отзывов, JSON-байты, сжатые варианты)
+REVIEW_PAGES_MAX = 2048
+_review_pages: OrderedDict[
+    tuple, tuple[str, bytes, dict[str, bytes]]
+] = OrderedDict()
+
+# Короткоживущий кэш доступности дат: tour_id -> (время сборки, JSON-байты).
+AVAILABILITY_TTL = 5  # секунд
+_availability: dict[str, tuple[float, bytes]] = {}
+_availability_versions: dict[str, int] = {}
+
+# Счётчик изменений тура. Увеличивается при каждой инвалидации, чтобы
+# запрос, начавший сборку до записи, не положил в кэш устаревшие данные.
+_tour_versions: dict[str, int] = {}
+_catalog_version = 0
+
+# Счётчик изменений отзывов тура, отдельно от мест — заказы не должны
+# сбрасывать ETag страниц отзывов.
+_review_versions: dict[str, int] = {}
+
+# Компактный индекс карточек рекомендаций: tour_id -> карточка в порядке
+# таблицы туров. Карточка содержит рейтинг тура, поэтому индекс
+# сбрасывается и с каталогом, и с любым изменением отзывов.
+_recommended_cards: dict[str, dict] | None = None
+_ratings_version = 0
+
+_lock = Lock()
+
+
+def tour_version(tour_id: str) -> tuple[int, int]:
+    with _lock:
+        return _catalog_version, _tour_versions.get(tour_id, 0)
+
+
+def _reviews_version(tour_id: str) -> str:
+    version = _review_versions.get(tour_id, 0)
+    return f"{INSTANCE_ID}-{_catalog_version}-{version}"
+
+
+def reviews_version(tour_id: str) -> str:
+    with _lock:
+        return _reviews_version(tour_id)
+
+
+def cards_version() -> tuple[int, int]:
+    with _lock:
+        return _catalog_version, _ratings_version
+
+
+def availability_version(tour_id: str) -> tuple[int, int]:
+    with _lock:
+        return _catalog_version, _availability_versions.get(tour_id, 0)
+
+
+def get_tour_document(
+    tour_id: str,
+) -> tuple[bytes, str, dict[str, bytes]] | None:
+    return _tour_documents.get(tour_id)
+
+
+def set_tour_document(
+    tour_id: str,
+    body: bytes,
+    etag: str,
+    variants: dict[str, bytes],
+    version: tuple[int, int],
+):
+    """
+    Сохраняет документ, только если тур не менялся с момента,
+    когда была получена version
+    """
+    with _lock:
+        if version != (_catalog_version, _tour_versions.get(tour_id, 0)):
+            return
+        _tour_documents[tour_id] = (body, etag, variants)
+
+
+def get_review_page(
+    key: tuple, version: str
+) -> tuple[bytes, dict[str, bytes]] | None:
+    with _lock:
+        entry = _review_pages.get(key)
+        if entry is None or entry[0] != version:
+            return None
+        _review_pages.move_to_end(key)
+        return entry[1], entry[2]
+
+
+def set_review_page(
+    key: tuple,
+    version: str,
+    body: bytes,
+    variants: dict[str, bytes],
+):
+    with _lock:
+        # версия могла смениться, пока страница собиралась
+        if version != _reviews_version(key[0]):
+            return
+        _review_pages[key] = (version, body, variants)
+        _review_pages.move_to_end(key)
+        while len(_review_pages) > REVIEW_PAGES_MAX:
+            _review_pages.popitem(last=False)
+
+
+def get_availability(tour_id: str) -> bytes | None:
+    entry = _availability.get(tour_id)
+    if entry is None:
+        return None
+
+    built_at, body = entry
+    if time.monotonic() - built_at > AVAILABILITY_TTL:
+        return None
+    return body
+
+
+def set_availability(tour_id: str, body: bytes, version: tuple[int, int]):
+    with _lock:
+        if version != (_catalog_version, _availability_versions.get(tour_id, 0)):
+            return
+        _availability[tour_id] = (time.monotonic(), body)
+
+
+def get_recommended_cards() -> dict[str, dict] | None:
+    return _recommended_cards
+
+
+def set_recommended_cards(cards: dict[str, dict], version: tuple[int, int]):
+    global _recommended_cards
+
+    with _lock:
+        if version != (_catalog_version, _ratings_version):
+            return
+        _recommended_cards = cards
+
+
+def invalidate_tour(*tour_ids: str):
+    with _lock:
+        for tour_id in tour_ids:
+            _tour_versions[tour_id] = _tour_versions.get(tour_id, 0) + 1
+            _tour_documents.pop(tour_id, None)
+
+
+def invalidate_availability(*tour_ids: str):
+    with _lock:
+        for tour_id in tour_ids:
+            _availability_versions[tour_id] = (
+                _availability_versions.get(tour_id, 0) + 1
+            )
+            _availability.pop(tour_id, None)
+
+
+def invalidate_reviews(tour_id: str):
+    global _ratings_version, _recommended_cards
+
+    with _lock:
+        _review_versions[tour_id] = _review_versions.get(tour_id, 0) + 1
+
+        # рейтинг тура показан в карточках рекомендаций других туров
+        _ratings_version += 1
+        _recommended_cards = None
+        _tour_documents.clear()
+
+    # сводка рейтинга входит в документ тура
+    invalidate_tour(tour_id)
+
+
+def invalidate_all():
+    global _catalog_version, _recommended_cards
+
+    with _lock:
+        _catalog_version += 1
+        _tour_documents.clear()
+        _review_pages.clear()
+        _availability.clear()
+        _recommended_cards = None
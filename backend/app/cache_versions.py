@@ -0,0 +1,112 @@
+"""
+Сброс кэшей процесса по изменениям, сделанным другими процессами.
+
+Кэши в app/cache.py живут в памяти процесса API, а каталог и отзывы
+пишет и отдельный процесс (json_db.py, python -m app.recommend, ручные
+правки базы). Триггеры SQLite на tours, bookings, tour_recommendations
+и reviews увеличивают счётчики в таблице cache_versions в той же
+транзакции, что и само изменение, кем бы оно ни было сделано.
+
+Процесс API сверяет счётчики не чаще раза в VERSION_CHECK_INTERVAL
+(из get_db, до обработчика запроса) и сбрасывает то, что изменилось:
+каталог — все кэши, отзывы тура — его страницы отзывов, документ и
+карточки с рейтингом. Изменения из другого процесса видны не позже
+чем через VERSION_CHECK_INTERVAL.
+"""
+
+import time
+from threading import Lock
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.cache import invalidate_all, invalidate_reviews
+
+VERSION_CHECK_INTERVAL = 1.0  # секунды
+
+CATALOG = "catalog"
+REVIEWS_PREFIX = "reviews:"
+
+
+def _bump(name: str) -> str:
+    return (
+        f"INSERT INTO cache_versions (name, version) VALUES ({name}, 1) "
+        "ON CONFLICT (name) DO UPDATE SET version = version + 1;"
+    )
+
+
+def _reviews(row: str) -> str:
+    return f"'{REVIEWS_PREFIX}' || {row}.tour_id"
+
+
+TRIGGERS = {
+    **{
+        f"{table}_cache_{event.lower()}": (
+            f"AFTER {event} ON {table} BEGIN {_bump(repr(CATALOG))} END"
+        )
+        for table in ("tours", "bookings", "tour_recommendations")
+        for event in ("INSERT", "UPDATE", "DELETE")
+    },
+    "reviews_cache_insert": f"AFTER INSERT ON reviews BEGIN {_bump(_reviews('NEW'))} END",
+    "reviews_cache_delete": f"AFTER DELETE ON reviews BEGIN {_bump(_reviews('OLD'))} END",
+    "reviews_cache_update": (
+        "AFTER UPDATE ON reviews "
+        f"BEGIN {_bump(_reviews('NEW'))} {_bump(_reviews('OLD'))} END"
+    ),
+}
+
+
+def create_cache_version_triggers(conn: Connection):
+    for name, body in TRIGGERS.items():
+        conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {name} {body}"))
+
+
+def db_catalog_version(db: Session) -> int:
+    """
+    Счётчик каталога прямо из базы — для индексов, которые должны
+    видеть загрузку каталога сразу, без ожидания сверки
+    """
+    version = db.execute(
+        text("SELECT version FROM cache_versions WHERE name = :name"),
+        {"name": CATALOG},
+    ).scalar()
+    return version or 0
+
+
+_seen: dict[str, int] | None = None
+_checked_at = float("-inf")
+_lock = Lock()
+
+
+def sync_cache_versions(db: Session):
+    """
+    Сбрасывает кэши, если счётчики в базе изменились с прошлой сверки.
+    Первая сверка только запоминает счётчики — кэши ещё пусты.
+    """
+    global _seen, _checked_at
+
+    now = time.monotonic()
+    if now - _checked_at < VERSION_CHECK_INTERVAL:
+        return
+
+    with _lock:
+        if now - _checked_at < VERSION_CHECK_INTERVAL:
+            return
+        _checked_at = now
+
+        versions = dict(
+            db.execute(text("SELECT name, version FROM cache_versions")).tuples().all()
+        )
+        # читающая транзакция не должна оставаться открытой
+        db.rollback()
+
+        seen, _seen = _seen, versions
+        if seen is None:
+            return
+
+    if versions.get(CATALOG) != seen.get(CATALOG):
+        invalidate_all()
+    for name, version in versions.items():
+        if name.startswith(REVIEWS_PREFIX) and seen.get(name) != version:
+            invalidate_reviews(name.removeprefix(REVIEWS_PREFIX))
@@ -0,0 +1,103 @@
+import gzip
+
+from fastapi import Response
+
+from app.responses import PreEncodedJSONResponse
+from app.utils import etag_matches
+
+try:
+    import brotli
+except ImportError:  # brotli необязателен: без него отдаём только gzip
+    brotli = None
+
+# Меньшие тела (ответы /api/subscribe и т.п.) не сжимаем — выигрыш
+# меньше накладных расходов на заголовки и распаковку
+MIN_COMPRESS_SIZE = 1024
+
+# Порядок предпочтения при равном q
+ENCODINGS = ("br", "gzip")
+
+# Документ тура сжимается один раз и отдаётся многократно — максимум
+# сжатия. Страницы отзывов по курсору и фильтрам редко запрашиваются
+# повторно: q11 стоил бы миллисекунды на каждом промахе кэша.
+BROTLI_QUALITY = 11
+DYNAMIC_BROTLI_QUALITY = 5
+
+
+def compress_variants(
+    body: bytes, brotli_quality: int = BROTLI_QUALITY
+) -> dict[str, bytes]:
+    """
+    Сжатые варианты тела для хранения рядом с кэшированным ответом
+    """
+    if len(body) < MIN_COMPRESS_SIZE:
+        return {}
+
+    variants = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(body, quality=brotli_quality)
+    return variants
+
+
+def choose_encoding(accept_encoding: str | None, available) -> str | None:
+    """
+    Выбирает кодировку по заголовку Accept-Encoding с учётом q-значений
+    """
+    if not accept_encoding or not available:
+        return None
+
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+
+    best, best_q = None, 0.0
+    for encoding in ENCODINGS:
+        if encoding not in available:
+            continue
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def variant_etag(etag: str, encoding: str | None) -> str:
+    """
+    У каждого представления свой сильный ETag
+    """
+    if encoding is None:
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def matching_etag(if_none_match: str | None, etag: str) -> str | None:
+    """
+    ETag представления, которое уже есть у клиента. Содержимое всех
+    вариантов одинаково, поэтому 304 подходит для любого из них.
+    """
+    for encoding in (None, *ENCODINGS):
+        candidate = variant_etag(etag, encoding)
+        if etag_matches(if_none_match, candidate):
+            return candidate
+    return None
+
+
+def encoded_response(
+    body: bytes,
+    variants: dict[str, bytes],
+    encoding: str | None,
+    headers: dict[str, str],
+) -> Response:
+    headers = {**headers, "Vary": "Accept-Encoding"}
+    if encoding is None:
+        return PreEncodedJSONResponse(content=body, headers=headers)
+
+    headers["Content-Encoding"] = encoding
+    return PreEncodedJSONResponse(content=variants[encoding], headers=headers)
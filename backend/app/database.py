@@ -1,6 +1,7 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
+from app.cache_versions import sync_cache_versions
 from app.config import get_settings
 
 settings = get_settings()
@@ -14,6 +15,8 @@ session = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 def get_db():
     db = session()
     try:
+        # изменения каталога и отзывов из других процессов
+        sync_cache_versions(db)
         yield db
     finally:
         db.close()
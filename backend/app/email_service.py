@@ -1,4 +1,3 @@
-import asyncio
 from datetime import datetime, timedelta
 import smtplib
 import uuid
@@ -11,10 +10,8 @@ from app.models import User
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
-from app.executors import executor
-from app.logger import logger
-from app.database import session
 from app.models import EmailToken
+from app.outbox import enqueue_email
 from app.schemas.order import AdditionalTravelers, PrimaryTraveler
 
 settings = get_settings()
@@ -24,7 +21,7 @@ def get_user_by_email(db: Session, email: str) -> User | None:
     return db.query(User).filter(User.email == email).first()
 
 
-def send_email_sync(to_email: str, subject: str, html_body: str):
+def build_message(to_email: str, subject: str, html_body: str) -> MIMEMultipart:
     msg = MIMEMultipart("alternative")
     msg["subject"] = subject
     msg["from"] = settings.SMTP.USER
@@ -32,57 +29,57 @@ def send_email_sync(to_email: str, subject: str, html_body: str):
 
     part_html = MIMEText(html_body, "html", "utf-8")
     msg.attach(part_html)
-
-    with smtplib.SMTP_SSL(settings.SMTP.HOST, settings.SMTP.PORT, timeout=10) as server:
-        server.login(settings.SMTP.USER, settings.SMTP.PASSWORD)
-        server.send_message(msg)
+    return msg
 
 
-async def send_email_async(to_email: str, subject: str, html_body: str):
-    loop = asyncio.get_event_loop()
+def smtp_connection() -> smtplib.SMTP_SSL:
+    """
+    Открывает SMTP-соединение с авторизацией. Воркер outbox отправляет
+    через одно соединение целую пачку писем.
+    """
+    server = smtplib.SMTP_SSL(settings.SMTP.HOST, settings.SMTP.PORT, timeout=10)
     try:
-        await loop.run_in_executor(
-            executor, lambda: send_email_sync(to_email, subject, html_body)
-        )
-        logger.info(f"email успешно отправлен на {to_email}")
-    except Exception as e:
-        logger.error(f"ошибка отправки email на {to_email}: {e}")
+        server.login(settings.SMTP.USER, settings.SMTP.PASSWORD)
+    except Exception:
+        server.close()
+        raise
+    return server
 
 
-async def send_all_emails_async(name: str, email: str):
-    admin_task = send_email_async(
+def enqueue_welcome_emails(db: Session, name: str, email: str):
+    enqueue_email(
+        db,
         settings.SMTP.ADMIN,
         "🎯 Новая регистрация KazWonder",
         build_html_for_admin(name, email),
     )
-    user_task = send_email_async(
+    enqueue_email(
+        db,
         email,
         "✨ Добро пожаловать в KazWonder!",
         build_html_for_user(name),
     )
-    await asyncio.gather(admin_task, user_task, return_exceptions=True)
 
 
-async def send_verification_email(user: User):
+def enqueue_verification_email(db: Session, user: User):
+    """
+    Создаёт токен подтверждения и ставит письмо в outbox; коммит —
+    за вызывающим, токен и письмо сохраняются вместе
+    """
     token = str(uuid.uuid4())
     expires_at = datetime.now() + timedelta(hours=24)
 
-    db = session()
-    try:
-        email_token = EmailToken(
-            user_id=user.id,
-            token=token,
-            expires_at=expires_at,
-            used=False,
-        )
-        db.add(email_token)
-        db.commit()
-    finally:
-        db.close()
+    email_token = EmailToken(
+        user_id=user.id,
+        token=token,
+        expires_at=expires_at,
+        used=False,
+    )
+    db.add(email_token)
 
     verify_url = f"{settings.FRONTEND_URL}login?verify_token={token}"
     html = build_html_verification(str(user.first_name) or "", verify_url)
-    await send_email_async(str(user.email), "Подтверждение регистрации KazWonder", html)
+    enqueue_email(db, str(user.email), "Подтверждение регистрации KazWonder", html)
 
 
 def build_html_for_admin(name: str, email: str) -> str:
@@ -0,0 +1,167 @@
+"""
+Потоковый экспорт отзывов и туров в NDJSON и CSV.
+
+Строки читаются курсором порциями по YIELD_PER (yield_per), кодируются
+и отдаются блоками, поэтому память не зависит от размера выгрузки.
+Используется эндпоинтом /api/admin/export/{kind} и из командной строки:
+
+    python -m app.export reviews --format csv --tour baikonur -o reviews.csv
+    python -m app.export tours > tours.ndjson
+"""
+
+import csv
+import io
+import json
+from datetime import date
+from typing import Any, Iterable, Iterator, Literal, Sequence
+
+from sqlalchemy import Row, select
+from sqlalchemy.orm import Session
+
+from app.models.booking import Booking
+from app.models.review import Review
+from app.models.tour import Tour
+
+YIELD_PER = 1000
+ROWS_PER_CHUNK = 500
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+REVIEW_COLUMNS = {
+    "id": Review.id,
+    "tour_id": Review.tour_id,
+    "name": Review.name,
+    "date": Review.date,
+    "rating": Review.rating,
+    "text": Review.text,
+}
+
+TOUR_COLUMNS = {
+    "id": Tour.id,
+    "title": Tour.title,
+    "images": Tour.images,
+    "description": Tour.description,
+    "included": Tour.included,
+    "excluded": Tour.excluded,
+    "what_to_bring": Tour.what_to_bring,
+    "important_info": Tour.important_info,
+    "faq": Tour.faq,
+    "organizer": Tour.organizer,
+    "map_popup": Tour.map_popup,
+    "map_lat": Tour.map_lat,
+    "map_long": Tour.map_long,
+    "cost": Booking.cost,
+    "currency": Booking.currency,
+    "days": Booking.days,
+    "prepayment": Booking.prepayment,
+    "max_seats": Booking.max_seats,
+}
+
+
+def _rows(db: Session, stmt) -> Iterator[Row[Any]]:
+    return iter(db.execute(stmt.execution_options(yield_per=YIELD_PER)))
+
+
+def iter_reviews(db: Session, tour_id: str | None = None) -> Iterator[Row[Any]]:
+    stmt = select(*REVIEW_COLUMNS.values()).order_by(Review.id)
+    if tour_id is not None:
+        stmt = stmt.where(Review.tour_id == tour_id)
+    return _rows(db, stmt)
+
+
+def iter_tours(db: Session, tour_id: str | None = None) -> Iterator[Row[Any]]:
+    stmt = (
+        select(*TOUR_COLUMNS.values())
+        .outerjoin(Booking, Booking.tour_id == Tour.id)
+        .order_by(Tour.id)
+    )
+    if tour_id is not None:
+        stmt = stmt.where(Tour.id == tour_id)
+    return _rows(db, stmt)
+
+
+EXPORTS = {
+    "reviews": (list(REVIEW_COLUMNS), iter_reviews),
+    "tours": (list(TOUR_COLUMNS), iter_tours),
+}
+
+
+def _json_default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _chunks(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Склеивает строки в блоки, чтобы не писать в сокет/файл по одной
+    """
+    chunk: list[str] = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= ROWS_PER_CHUNK:
+            yield "".join(chunk)
+            chunk.clear()
+    if chunk:
+        yield "".join(chunk)
+
+
+def ndjson_lines(fields: list[str], rows: Iterable[Sequence[Any]]) -> Iterator[str]:
+    for row in rows:
+        yield (
+            json.dumps(dict(zip(fields, row)), ensure_ascii=False, default=_json_default)
+            + "\n"
+        )
+
+
+def csv_lines(fields: list[str], rows: Iterable[Sequence[Any]]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def line(values) -> str:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(values)
+        return buffer.getvalue()
+
+    yield line(fields)
+    for row in rows:
+        # списки и объекты (JSON-колонки туров) пишутся JSON-строкой
+        yield line(
+            json.dumps(v, ensure_ascii=False) if isinstance(v, (list, dict)) else v
+            for v in row
+        )
+
+
+def stream_export(
+    db: Session, kind: str, fmt: ExportFormat, tour_id: str | None = None
+) -> Iterator[str]:
+    fields, iter_rows = EXPORTS[kind]
+    rows = iter_rows(db, tour_id)
+    lines = csv_lines(fields, rows) if fmt == "csv" else ndjson_lines(fields, rows)
+    return _chunks(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    from app.database import session
+
+    parser = argparse.ArgumentParser(description="Потоковый экспорт отзывов и туров")
+    parser.add_argument("kind", choices=list(EXPORTS))
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--tour", help="только этот тур и его отзывы")
+    parser.add_argument("-o", "--output", help="файл (по умолчанию stdout)")
+    args = parser.parse_args()
+
+    out = (
+        open(args.output, "w", encoding="utf-8", newline="")
+        if args.output
+        else sys.stdout
+    )
+    with session() as db, out:
+        for chunk in stream_export(db, args.kind, args.format, args.tour):
+            out.write(chunk)
@@ -0,0 +1,157 @@
+import bisect
+import heapq
+import math
+from threading import Lock
+
+from sqlalchemy.orm import Session
+
+from app.cache_versions import db_catalog_version
+from app.models.tour import Tour
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def _to_xyz(lat: float, long: float) -> tuple[float, float, float]:
+    phi, lam = math.radians(lat), math.radians(long)
+    return (
+        math.cos(phi) * math.cos(lam),
+        math.cos(phi) * math.sin(lam),
+        math.sin(phi),
+    )
+
+
+def _chord_to_km(chord: float) -> float:
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+class _Node:
+    __slots__ = ("point", "tour_id", "axis", "left", "right")
+
+    def __init__(self, point, tour_id, axis, left, right):
+        self.point = point
+        self.tour_id = tour_id
+        self.axis = axis
+        self.left = left
+        self.right = right
+
+
+class TourGeoIndex:
+    """
+    Пространственный индекс туров.
+
+    Ближайшие соседи ищутся по k-d дереву над точками единичной сферы:
+    евклидово расстояние (хорда) монотонно по отношению к расстоянию
+    по большому кругу, поэтому отсечение веток точное и без haversine
+    для каждой пары. Прямоугольник карты — бинарный поиск по широте
+    и фильтр по долготе.
+    """
+
+    def __init__(self, points: list[tuple[str, float, float]]):
+        self.coords = {tour_id: (lat, long) for tour_id, lat, long in points}
+
+        self._root = self._build(
+            [(_to_xyz(lat, long), tour_id) for tour_id, lat, long in points], 0
+        )
+
+        self._by_lat = sorted((lat, long, tour_id) for tour_id, lat, long in points)
+        self._lats = [lat for lat, _, _ in self._by_lat]
+
+    def _build(self, items, depth):
+        if not items:
+            return None
+
+        axis = depth % 3
+        items.sort(key=lambda item: item[0][axis])
+        mid = len(items) // 2
+        point, tour_id = items[mid]
+
+        return _Node(
+            point,
+            tour_id,
+            axis,
+            self._build(items[:mid], depth + 1),
+            self._build(items[mid + 1:], depth + 1),
+        )
+
+    def nearest(
+        self, lat: float, long: float, k: int, exclude: str | None = None
+    ) -> list[tuple[str, float]]:
+        """
+        k ближайших туров к точке: [(tour_id, расстояние в км)]
+        """
+        target = _to_xyz(lat, long)
+        best: list[tuple[float, str]] = []  # max-heap по -расстоянию
+
+        def visit(node):
+            if node is None:
+                return
+
+            dist = math.dist(target, node.point)
+            if node.tour_id != exclude:
+                if len(best) < k:
+                    heapq.heappush(best, (-dist, node.tour_id))
+                elif dist < -best[0][0]:
+                    heapq.heapreplace(best, (-dist, node.tour_id))
+
+            diff = target[node.axis] - node.point[node.axis]
+            near, far = (node.left, node.right) if diff < 0 else (node.right, node.left)
+            visit(near)
+            if len(best) < k or abs(diff) < -best[0][0]:
+                visit(far)
+
+        visit(self._root)
+
+        return [
+            (tour_id, _chord_to_km(-neg_dist))
+            for neg_dist, tour_id in sorted(best, reverse=True)
+        ]
+
+    def within(
+        self, south: float, west: float, north: float, east: float
+    ) -> list[str]:
+        """
+        Туры внутри прямоугольника карты. west > east означает, что
+        прямоугольник пересекает 180-й меридиан.
+        """
+        lo = bisect.bisect_left(self._lats, south)
+        hi = bisect.bisect_right(self._lats, north)
+
+        if west <= east:
+            return [
+                tour_id for _, long, tour_id in self._by_lat[lo:hi]
+                if west <= long <= east
+            ]
+        return [
+            tour_id for _, long, tour_id in self._by_lat[lo:hi]
+            if long >= west or long <= east
+        ]
+
+
+_index: TourGeoIndex | None = None
+_index_version = -1
+_lock = Lock()
+
+
+def get_geo_index(db: Session) -> TourGeoIndex:
+    """
+    Возвращает индекс, перестраивая его после изменения каталога любым
+    процессом (счётчик catalog в cache_versions меняют триггеры на tours).
+    Читаются только три колонки: id, map_lat, map_long.
+    """
+    global _index, _index_version
+
+    version = db_catalog_version(db)
+    if _index is not None and _index_version == version:
+        return _index
+
+    with _lock:
+        if _index is None or _index_version != version:
+            rows = (
+                db.query(Tour.id, Tour.map_lat, Tour.map_long)
+                .filter(Tour.map_lat.is_not(None), Tour.map_long.is_not(None))
+                .all()
+            )
+            _index = TourGeoIndex([(str(id), lat, long) for id, lat, long in rows])
+            _index_version = version
+
+    return _index
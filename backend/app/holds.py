@@ -0,0 +1,225 @@
+"""
+Временные брони мест на время оформления заказа.
+
+Бронь сразу списывает места с BookingDate.seats (тем же условным
+UPDATE, что и заказ), поэтому /api/tours/availability показывает
+остаток уже за вычетом броней. Через HOLD_TTL непогашенная бронь
+истекает и места возвращаются.
+
+Сроки истечения лежат в куче в памяти процесса: поток-уборщик спит до
+ближайшего срока и затем одним пакетом (два SQL-запроса на все
+истёкшие брони) возвращает места и удаляет строки. Таблица seat_holds
+остаётся источником истины: уборщик всегда освобождает всё, что
+истекло по базе, так что брони, пережившие перезапуск или созданные
+другим процессом, тоже возвращаются — не позже чем через SWEEP_INTERVAL.
+
+Бронь не больше max_seats тура, а действующих броней у пользователя не
+больше MAX_ACTIVE_HOLDS — иначе один пользователь мог бы придержать
+все места тура.
+"""
+
+import heapq
+from datetime import datetime, timedelta
+from threading import Condition, Thread
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.cache import invalidate_availability
+from app.database import session
+from app.logger import logger
+from app.models.booking import Booking, BookingDate
+from app.models.hold import SeatHold
+from app.seats import release_seats, reserve_seats
+
+HOLD_TTL = timedelta(minutes=10)
+SWEEP_INTERVAL = 60.0  # секунды: страховочный проход при пустой куче
+MAX_ACTIVE_HOLDS = 3  # на пользователя, по всем датам
+
+
+def _tour_ids(db: Session, booking_date_ids) -> list[str]:
+    return list(
+        db.scalars(
+            select(Booking.tour_id)
+            .join(BookingDate, BookingDate.booking_id == Booking.id)
+            .where(BookingDate.id.in_(booking_date_ids))
+            .distinct()
+        )
+    )
+
+
+def release_expired(db: Session, now: datetime | None = None) -> int:
+    """
+    Возвращает места всех истёкших броней и удаляет их одной транзакцией.
+    Возвращает число освобождённых броней.
+    """
+    now = now or datetime.now()
+    expired = SeatHold.expires_at <= now
+    expired_dates = select(SeatHold.booking_date_id).where(expired)
+
+    held = (
+        select(func.sum(SeatHold.seats))
+        .where(SeatHold.booking_date_id == BookingDate.id, expired)
+        .scalar_subquery()
+    )
+    db.execute(
+        update(BookingDate)
+        .where(BookingDate.id.in_(expired_dates))
+        .values(seats=BookingDate.seats + held)
+        .execution_options(synchronize_session=False)
+    )
+    tour_ids = _tour_ids(db, expired_dates)
+    released = db.execute(delete(SeatHold).where(expired)).rowcount  # pyright: ignore[reportAttributeAccessIssue]
+    db.commit()
+
+    if released:
+        invalidate_availability(*tour_ids)
+    return released
+
+
+class HoldSweeper:
+    """
+    Куча (срок истечения, id брони) и поток, который будит уборку
+    к ближайшему сроку
+    """
+
+    def __init__(self, session_factory: sessionmaker):
+        self._session_factory = session_factory
+        self._heap: list[tuple[datetime, int]] = []
+        self._condition = Condition()
+        self._thread: Thread | None = None
+
+    def schedule(self, hold_id: int, expires_at: datetime):
+        with self._condition:
+            heapq.heappush(self._heap, (expires_at, hold_id))
+            # новая бронь могла истекать раньше текущей вершины
+            self._condition.notify()
+
+    def start(self):
+        """
+        Запускает уборщика: сразу освобождает истёкшее (например, до
+        перезапуска) и ставит в кучу действующие брони
+        """
+        if self._thread is not None:
+            return
+
+        with self._session_factory() as db:
+            release_expired(db)
+            for hold_id, expires_at in db.execute(
+                select(SeatHold.id, SeatHold.expires_at)
+            ):
+                self.schedule(hold_id, expires_at)
+
+        self._thread = Thread(target=self._run, name="hold-sweeper", daemon=True)
+        self._thread.start()
+
+    def _wait_for_expiry(self):
+        with self._condition:
+            while True:
+                if not self._heap:
+                    self._condition.wait(SWEEP_INTERVAL)
+                    return
+
+                delay = (self._heap[0][0] - datetime.now()).total_seconds()
+                if delay <= 0:
+                    # все истёкшие сроки снимаются разом — их освободит
+                    # один пакетный проход
+                    now = datetime.now()
+                    while self._heap and self._heap[0][0] <= now:
+                        heapq.heappop(self._heap)
+                    return
+
+                self._condition.wait(min(delay, SWEEP_INTERVAL))
+
+    def _run(self):
+        while True:
+            self._wait_for_expiry()
+            try:
+                with self._session_factory() as db:
+                    release_expired(db)
+            except Exception as e:
+                logger.error(f"ошибка освобождения броней мест: {e}")
+
+
+def create_hold(
+    db: Session, user_id: int, booking_date_id: int, seats: int
+) -> SeatHold | None:
+    """
+    Бронирует seats мест для пользователя. Действующая бронь того же
+    пользователя на ту же дату заменяется: списывается или возвращается
+    только разница. None, если свободных мест не хватает.
+    """
+    now = datetime.now()
+    active = db.query(SeatHold).filter(
+        SeatHold.user_id == user_id, SeatHold.expires_at > now
+    )
+    hold = active.filter(SeatHold.booking_date_id == booking_date_id).first()
+
+    if hold is None and active.count() >= MAX_ACTIVE_HOLDS:
+        db.rollback()
+        raise HTTPException(
+            status_code=429,
+            detail=f"Нельзя держать больше {MAX_ACTIVE_HOLDS} броней одновременно",
+        )
+
+    held: int = hold.seats if hold else 0  # pyright: ignore[reportAssignmentType]
+    delta = seats - held
+    if delta > 0 and not reserve_seats(db, booking_date_id, delta):
+        db.rollback()
+        return None
+    if delta < 0:
+        release_seats(db, booking_date_id, -delta)
+
+    if hold is None:
+        hold = SeatHold(user_id=user_id, booking_date_id=booking_date_id)
+        db.add(hold)
+    hold.seats = seats  # pyright: ignore[reportAttributeAccessIssue]
+    hold.expires_at = now + HOLD_TTL  # pyright: ignore[reportAttributeAccessIssue]
+
+    db.commit()
+    return hold
+
+
+def take_hold(db: Session, hold_id: int, user_id: int, booking_date_id: int) -> int:
+    """
+    Погашает действующую бронь в текущей транзакции (без commit) и
+    возвращает число уже списанных по ней мест; 0, если брони нет или
+    она истекла
+    """
+    seats = db.scalar(
+        delete(SeatHold)
+        .where(
+            SeatHold.id == hold_id,
+            SeatHold.user_id == user_id,
+            SeatHold.booking_date_id == booking_date_id,
+            SeatHold.expires_at > datetime.now(),
+        )
+        .returning(SeatHold.seats)
+    )
+    return seats or 0
+
+
+def cancel_hold(db: Session, hold_id: int, user_id: int) -> bool:
+    """
+    Отменяет бронь пользователя и сразу возвращает её места
+    """
+    row = db.execute(
+        delete(SeatHold)
+        .where(SeatHold.id == hold_id, SeatHold.user_id == user_id)
+        .returning(SeatHold.booking_date_id, SeatHold.seats)
+    ).first()
+    if row is None:
+        db.rollback()
+        return False
+
+    booking_date_id, seats = row
+    release_seats(db, booking_date_id, seats)
+    tour_ids = _tour_ids(db, [booking_date_id])
+    db.commit()
+
+    invalidate_availability(*tour_ids)
+    return True
+
+
+hold_sweeper = HoldSweeper(session)
@@ -0,0 +1,135 @@
+"""
+Идемпотентность POST /api/orders по заголовку Idempotency-Key.
+
+Первый запрос с ключом занимает строку idempotency_keys (уникальный
+индекс по пользователю и ключу) и коммитит её до начала работы.
+Результат — код ответа и тело — записывается в ту же строку той же
+транзакцией, что и заказ, поэтому заказ без сохранённого ответа
+существовать не может. Повтор с тем же ключом получает сохранённый
+ответ без обращения к BookingDate и без нового письма.
+
+Повтор, пришедший, пока первый запрос ещё выполняется, не создаёт
+второй заказ: он ждёт, пока у строки появится результат. Если первый
+запрос упал, не дойдя до результата, строка удаляется и ключ можно
+занять снова. Если же процесс умер посреди запроса и удалить строку
+было некому, занятый ключ без результата считается брошенным через
+IN_FLIGHT_LEASE и перезанимается следующим повтором.
+
+Ключи живут KEY_TTL; просроченные удаляются при каждом занятии ключа
+одним DELETE по индексу expires_at.
+"""
+
+import asyncio
+import hashlib
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from app.models.idempotency import IdempotencyKey
+
+KEY_TTL = timedelta(hours=24)
+IN_FLIGHT_LEASE = timedelta(seconds=30)  # заказ создаётся за доли секунды
+MAX_KEY_LENGTH = 255
+WAIT_TIMEOUT = 10.0  # секунды: сколько повтор ждёт выполняющийся запрос
+WAIT_INTERVAL = 0.05
+
+
+def request_fingerprint(data: BaseModel) -> str:
+    return hashlib.sha256(data.model_dump_json().encode()).hexdigest()
+
+
+def claim_key(db: Session, user_id: int, key: str, fingerprint: str) -> int | None:
+    """
+    Занимает ключ и возвращает id строки; None, если ключ уже занят
+    """
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail="Invalid Idempotency-Key")
+
+    now = datetime.now()
+    db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= now))
+    # брошенный ключ: занят, но результата нет дольше IN_FLIGHT_LEASE
+    db.execute(
+        delete(IdempotencyKey).where(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key,
+            IdempotencyKey.status_code.is_(None),
+            IdempotencyKey.created_at <= now - IN_FLIGHT_LEASE,
+        )
+    )
+    key_id = db.scalar(
+        insert(IdempotencyKey)
+        .values(
+            user_id=user_id,
+            key=key,
+            fingerprint=fingerprint,
+            created_at=now,
+            expires_at=now + KEY_TTL,
+        )
+        .prefix_with("OR IGNORE")
+        .returning(IdempotencyKey.id)
+    )
+    db.commit()
+    return key_id
+
+
+def complete_key(db: Session, key_id: int, status_code: int, response: dict):
+    """
+    Записывает результат в текущей транзакции (без commit). Если ключ
+    успели перезанять как брошенный, транзакция заказа откатывается —
+    иначе заказ остался бы без ключа и повтор создал бы второй.
+    """
+    result = db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.id == key_id)
+        .values(status_code=status_code, response=response)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:  # pyright: ignore[reportAttributeAccessIssue]
+        db.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail="Запрос с этим Idempotency-Key ещё выполняется",
+        )
+
+
+def release_key(db: Session, key_id: int):
+    """
+    Освобождает ключ запроса, который завершился без результата
+    """
+    db.rollback()
+    db.execute(delete(IdempotencyKey).where(IdempotencyKey.id == key_id))
+    db.commit()
+
+
+async def wait_for_result(db: Session, user_id: int, key: str) -> Row | None:
+    """
+    Ждёт результат запроса, занявшего ключ. None — ключ освободился
+    или брошен, и его можно занять заново.
+    """
+    deadline = asyncio.get_running_loop().time() + WAIT_TIMEOUT
+    while True:
+        row = db.execute(
+            select(
+                IdempotencyKey.fingerprint,
+                IdempotencyKey.status_code,
+                IdempotencyKey.response,
+                IdempotencyKey.created_at,
+            ).where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+        ).first()
+        # читающая транзакция не должна держать блокировку, пока мы ждём
+        db.rollback()
+
+        if row is None or row.status_code is not None:
+            return row
+        if row.created_at <= datetime.now() - IN_FLIGHT_LEASE:
+            return None
+        if asyncio.get_running_loop().time() >= deadline:
+            raise HTTPException(
+                status_code=409,
+                detail="Запрос с этим Idempotency-Key ещё выполняется",
+            )
+        await asyncio.sleep(WAIT_INTERVAL)
@@ -0,0 +1,147 @@
+"""
+Миграции схемы SQLite.
+
+create_all создаёт только отсутствующие таблицы и не трогает уже
+существующие, поэтому индексы и изменения старых таблиц применяются
+здесь. Номер последней применённой миграции хранится в
+PRAGMA user_version; каждая миграция выполняется один раз, в своей
+транзакции.
+
+Новая миграция добавляется в конец MIGRATIONS и больше не меняется.
+"""
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app.cache_versions import create_cache_version_triggers
+from app.ratings import create_rating_triggers, reconcile_ratings
+
+
+def _review_indexes(conn: Connection):
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_reviews_tour_date "
+            "ON reviews (tour_id, date DESC, id DESC)"
+        )
+    )
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_reviews_tour_rating "
+            "ON reviews (tour_id, rating)"
+        )
+    )
+    # статистика для планировщика по новым индексам
+    conn.execute(text("ANALYZE reviews"))
+
+
+def _rating_aggregates(conn: Connection):
+    # саму таблицу tour_ratings создаёт create_all
+    create_rating_triggers(conn)
+    reconcile_ratings(conn)
+
+
+def _review_authors(conn: Connection):
+    columns = [row[1] for row in conn.execute(text("PRAGMA table_info(reviews)"))]
+    if "user_id" not in columns:
+        conn.execute(
+            text("ALTER TABLE reviews ADD COLUMN user_id INTEGER REFERENCES users (id)")
+        )
+    conn.execute(
+        text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS ux_reviews_tour_user "
+            "ON reviews (tour_id, user_id) WHERE user_id IS NOT NULL"
+        )
+    )
+
+
+def _review_sort_indexes(conn: Connection):
+    # сводку рейтинга теперь отдаёт tour_ratings, а (tour_id, rating)
+    # покрывается индексом по звёздам
+    conn.execute(text("DROP INDEX IF EXISTS ix_reviews_tour_rating"))
+    statements = [
+        "ix_reviews_tour_stars ON reviews (tour_id, rating DESC, date DESC, id DESC)",
+        "ix_reviews_tour_date_detailed ON reviews (tour_id, date DESC, id DESC) "
+        "WHERE length(text) >= 200",
+        "ix_reviews_tour_stars_detailed ON reviews "
+        "(tour_id, rating DESC, date DESC, id DESC) WHERE length(text) >= 200",
+    ]
+    for statement in statements:
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {statement}"))
+    conn.execute(text("ANALYZE reviews"))
+
+
+def _order_history_index(conn: Connection):
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_orders_user_created "
+            "ON orders (user_id, created_at DESC, id DESC)"
+        )
+    )
+
+
+def _native_travellers(conn: Connection):
+    # раньше путешественники писались через model_dump_json() в JSON-колонку,
+    # то есть строкой с JSON внутри; разворачиваем её одним UPDATE на колонку
+    for column in ("primary_traveler", "additional_travelers"):
+        conn.execute(
+            text(
+                f"UPDATE orders SET {column} = json(json_extract({column}, '$')) "
+                f"WHERE json_valid({column}) AND json_type({column}) = 'text'"
+            )
+        )
+    # пустой список дополнительных путешественников хранился как "[]"
+    conn.execute(
+        text(
+            "UPDATE orders SET additional_travelers = NULL "
+            "WHERE json_valid(additional_travelers) "
+            "AND json_type(additional_travelers) = 'array' "
+            "AND json_array_length(additional_travelers) = 0"
+        )
+    )
+
+
+def _cache_version_triggers(conn: Connection):
+    # саму таблицу cache_versions создаёт create_all
+    create_cache_version_triggers(conn)
+
+
+def _recommendation_cache_triggers(conn: Connection):
+    # создаёт только недостающие — триггеры на tour_recommendations
+    create_cache_version_triggers(conn)
+
+
+MIGRATIONS = [
+    _review_indexes,
+    _rating_aggregates,
+    _review_authors,
+    _review_sort_indexes,
+    _order_history_index,
+    _native_travellers,
+    _cache_version_triggers,
+    _recommendation_cache_triggers,
+]
+
+
+def schema_version(conn: Connection) -> int:
+    return conn.execute(text("PRAGMA user_version")).scalar_one()
+
+
+def migrate(engine: Engine):
+    """
+    Применяет миграции, которых ещё нет в базе. Вызывается после
+    create_all при старте приложения и в json_db.
+    """
+    with engine.connect() as conn:
+        current = schema_version(conn)
+
+    for version, migration in enumerate(MIGRATIONS[current:], start=current + 1):
+        with engine.begin() as conn:
+            migration(conn)
+            conn.execute(text(f"PRAGMA user_version = {version}"))
+
+
+if __name__ == "__main__":
+    from app.database import engine
+
+    migrate(engine)
+    print(f"Схема обновлена до версии {len(MIGRATIONS)}")
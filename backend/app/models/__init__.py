@@ -7,4 +7,10 @@ from .support import SupportMessage
 from .tour import Tour
 from .booking import Booking, BookingDate
 from .review import Review
-from .order import Order
\ No newline at end of file
+from .order import Order
+from .recommendation import TourRecommendation
+from .rating import TourRating
+from .hold import SeatHold
+from .outbox import OutboxEmail
+from .idempotency import IdempotencyKey
+from .cache_version import CacheVersion
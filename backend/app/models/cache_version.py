@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String
+
+from app.models.base import Base
+
+
+class CacheVersion(Base):
+    """
+    Счётчики изменений каталога и отзывов, видимые всем процессам.
+    Увеличиваются триггерами на tours, bookings и reviews
+    (см. app/cache_versions.py)
+    """
+
+    __tablename__ = "cache_versions"
+
+    # "catalog" или "reviews:<tour_id>"
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
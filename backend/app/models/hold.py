@@ -0,0 +1,21 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer
+
+from app.models.base import Base
+
+
+class SeatHold(Base):
+    """
+    Временная бронь мест на время оформления заказа. Места списываются
+    с BookingDate.seats сразу и возвращаются при истечении брони
+    (см. app/holds.py); таблица нужна, чтобы вернуть их и после
+    перезапуска процесса.
+    """
+
+    __tablename__ = "seat_holds"
+    __table_args__ = (Index("ix_seat_holds_expires_at", "expires_at"),)
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    booking_date_id = Column(Integer, ForeignKey("booking_dates.id"), nullable=False)
+    seats = Column(Integer, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
@@ -0,0 +1,29 @@
+from datetime import datetime
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Index, Integer, String
+
+from app.models.base import Base
+
+
+class IdempotencyKey(Base):
+    """
+    Результат первого запроса с заголовком Idempotency-Key. Пока
+    status_code пуст, запрос ещё выполняется (см. app/idempotency.py).
+    """
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        Index("ux_idempotency_keys_user_key", "user_id", "key", unique=True),
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    key = Column(String, nullable=False)
+    # хэш тела запроса: тот же ключ с другими данными — ошибка клиента
+    fingerprint = Column(String, nullable=False)
+
+    status_code = Column(Integer, nullable=True)
+    response = Column(JSON, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.now)
+    expires_at = Column(DateTime, nullable=False)
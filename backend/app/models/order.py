@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, JSON, desc
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -7,6 +7,10 @@ from app.models.base import Base
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # история заказов: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        Index("ix_orders_user_created", "user_id", desc("created_at"), desc("id")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -0,0 +1,32 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Index, Integer, String
+
+from app.models.base import Base
+
+
+class OutboxEmail(Base):
+    """
+    Письмо, ожидающее отправки. Строка пишется в той же транзакции, что
+    и заказ, подписка или обращение в поддержку, а отправляет её
+    отдельный процесс-воркер (см. app/outbox.py).
+    """
+
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # выборка воркера: WHERE status = 'pending' AND next_attempt_at <= ?
+        Index("ix_email_outbox_status_next", "status", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    to_email = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    html_body = Column(String, nullable=False)
+
+    # pending -> sent | dead (исчерпаны попытки)
+    status = Column(String, nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.now)
+    last_error = Column(String, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.now)
+    sent_at = Column(DateTime, nullable=True)
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, ForeignKey, Integer, String
+
+from app.models.base import Base
+
+
+class TourRating(Base):
+    """
+    Агрегаты отзывов тура. Поддерживаются триггерами на reviews в той же
+    транзакции, что и изменение отзыва (см. app/ratings.py)
+    """
+
+    __tablename__ = "tour_ratings"
+
+    tour_id = Column(String, ForeignKey("tours.id"), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Integer, nullable=False, default=0)
+    stars_1 = Column(Integer, nullable=False, default=0)
+    stars_2 = Column(Integer, nullable=False, default=0)
+    stars_3 = Column(Integer, nullable=False, default=0)
+    stars_4 = Column(Integer, nullable=False, default=0)
+    stars_5 = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Float, ForeignKey, Integer, String
+
+from app.models.base import Base
+
+
+class TourRecommendation(Base):
+    """
+    Предрассчитанные top-k рекомендации для тура (см. app/recommend.py)
+    """
+
+    __tablename__ = "tour_recommendations"
+
+    tour_id = Column(String, ForeignKey("tours.id"), primary_key=True)
+    position = Column(Integer, primary_key=True)
+    recommended_id = Column(String, ForeignKey("tours.id"), nullable=False)
+    score = Column(Float, nullable=False)
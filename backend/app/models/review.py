@@ -1,17 +1,51 @@
-from sqlalchemy import CheckConstraint, Column, Date, ForeignKey, Integer, String, Text
-from sqlalchemy.orm import relationship
-
-from app.models.base import Base
-
-
-class Review(Base):
-    __tablename__ = 'reviews'
-    
-    id = Column(Integer, primary_key=True)
-    tour_id = Column(String, ForeignKey('tours.id'), nullable=False)
-    name = Column(String(100), nullable=False)
-    date = Column(Date, nullable=False)
-    rating = Column(Integer, CheckConstraint('rating >= 1 AND rating <= 5'), nullable=False)
-    text = Column(Text, nullable=False)
-    
-    tour = relationship("Tour", back_populates="reviews")
+from sqlalchemy import (
+    CheckConstraint, Column, Date, ForeignKey, Index, Integer, String, Text, desc,
+)
+from sqlalchemy import text as sql_text
+from sqlalchemy.orm import relationship
+
+from app.models.base import Base
+
+# "Подробные" отзывы: фильтр detailed в /api/reviews и частичные индексы
+DETAILED_MIN_LENGTH = 200
+_DETAILED = sql_text(f'length(text) >= {DETAILED_MIN_LENGTH}')
+
+
+class Review(Base):
+    __tablename__ = 'reviews'
+    __table_args__ = (
+        # Каждой сортировке /api/reviews соответствует проход по индексу
+        # в прямом или обратном направлении, фильтр по звёздам — диапазон
+        # внутри индекса по рейтингу, detailed — частичные индексы.
+        # newest / oldest
+        Index('ix_reviews_tour_date', 'tour_id', desc('date'), desc('id')),
+        # highest / lowest, а также stars=N в порядке newest
+        Index(
+            'ix_reviews_tour_stars', 'tour_id', desc('rating'), desc('date'), desc('id')
+        ),
+        Index(
+            'ix_reviews_tour_date_detailed', 'tour_id', desc('date'), desc('id'),
+            sqlite_where=_DETAILED,
+        ),
+        Index(
+            'ix_reviews_tour_stars_detailed',
+            'tour_id', desc('rating'), desc('date'), desc('id'),
+            sqlite_where=_DETAILED,
+        ),
+        # один отзыв пользователя на тур
+        Index(
+            'ux_reviews_tour_user', 'tour_id', 'user_id',
+            unique=True, sqlite_where=sql_text('user_id IS NOT NULL'),
+        ),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    tour_id = Column(String, ForeignKey('tours.id'), nullable=False)
+    name = Column(String(100), nullable=False)
+    date = Column(Date, nullable=False)
+    rating = Column(Integer, CheckConstraint('rating >= 1 AND rating <= 5'), nullable=False)
+    text = Column(Text, nullable=False)
+    # автор отзыва, оставленного через API (у импортированных из json — NULL)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=True)
+    
+    tour = relationship("Tour", back_populates="reviews")
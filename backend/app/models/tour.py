@@ -1,38 +1,41 @@
-from sqlalchemy import Column, String, Float, JSON
-from sqlalchemy.orm import relationship
-
-from app.models import Base
-
-
-class Tour(Base):
-    __tablename__ = 'tours'
-    
-    id = Column(String(50), primary_key=True) # +
-    title = Column(String(200), nullable=False) # +
-    
-    # Описание как JSON array
-    description = Column(JSON)
-    
-    # Изображения как JSON array
-    images = Column(JSON) # +
-    
-    included = Column(JSON)
-    excluded = Column(JSON)
-    what_to_bring = Column(JSON)
-    important_info = Column(JSON)
-    faq = Column(JSON)
-    organizer = Column(JSON)
-
-    # Map координаты
-    map_popup = Column(String(200))
-    map_lat = Column(Float)
-    map_long = Column(Float)
-    
-    # Relationships
-    booking = relationship(
-        "Booking",
-        back_populates="tour",
-        uselist=False
-    )
-    reviews = relationship("Review", back_populates="tour", cascade="all, delete-orphan")
+from sqlalchemy import Column, String, Float, JSON
+from sqlalchemy.orm import deferred, relationship
+
+from app.models import Base
+
+
+class Tour(Base):
+    __tablename__ = 'tours'
+    
+    id = Column(String(50), primary_key=True) # +
+    title = Column(String(200), nullable=False) # +
+    
+    # Тяжёлые JSON-колонки отложены (группа "content"): списки и каталог
+    # их не читают, полный документ тура загружает их через undefer_group
+
+    # Описание как JSON array
+    description = deferred(Column(JSON), group="content")
+    
+    # Изображения как JSON array
+    images = Column(JSON) # +
+    
+    included = deferred(Column(JSON), group="content")
+    excluded = deferred(Column(JSON), group="content")
+    what_to_bring = deferred(Column(JSON), group="content")
+    important_info = deferred(Column(JSON), group="content")
+    faq = deferred(Column(JSON), group="content")
+    organizer = deferred(Column(JSON), group="content")
+
+    # Map координаты
+    map_popup = Column(String(200))
+    map_lat = Column(Float)
+    map_long = Column(Float)
+    
+    # Relationships
+    booking = relationship(
+        "Booking",
+        back_populates="tour",
+        uselist=False
+    )
+    reviews = relationship("Review", back_populates="tour", cascade="all, delete-orphan")
  
\ No newline at end of file
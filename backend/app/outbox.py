@@ -0,0 +1,121 @@
+"""
+Очередь исходящих писем (transactional outbox).
+
+Обработчики API не ходят в SMTP: письмо добавляется в email_outbox той
+же транзакцией, что и заказ, подписка или обращение, и сохраняется
+вместе с ними или не сохраняется вовсе. Отправляет письма отдельный
+процесс (app/outbox_worker.py).
+
+Воркер забирает пачку готовых к отправке писем одним UPDATE ... RETURNING,
+сдвигая next_attempt_at на LEASE вперёд: параллельный воркер их не
+возьмёт, а если процесс упадёт посреди отправки, письма снова станут
+доступны после LEASE. Неудачная попытка откладывает письмо с
+экспоненциальной задержкой; после MAX_ATTEMPTS письмо помечается как
+dead и остаётся в таблице для разбора.
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from app.models.outbox import OutboxEmail
+
+MAX_ATTEMPTS = 8
+RETRY_BASE = 30.0  # секунды: 30 с, 1 мин, 2 мин, ... до RETRY_MAX
+RETRY_MAX = 3600.0
+LEASE = timedelta(minutes=5)
+SENT_RETENTION = timedelta(days=7)
+
+
+def enqueue_email(db: Session, to_email: str, subject: str, html_body: str):
+    """
+    Ставит письмо в очередь. Коммит — за вызывающим: письмо уходит
+    только вместе с данными, ради которых оно написано.
+    """
+    db.add(OutboxEmail(to_email=to_email, subject=subject, html_body=html_body))
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(RETRY_BASE * 2 ** (attempts - 1), RETRY_MAX))
+
+
+def claim_batch(db: Session, limit: int, now: datetime | None = None) -> list[Row]:
+    """
+    Забирает до limit писем, которым пора уходить, и продлевает их
+    next_attempt_at на LEASE
+    """
+    now = now or datetime.now()
+    due = (
+        select(OutboxEmail.id)
+        .where(OutboxEmail.status == "pending", OutboxEmail.next_attempt_at <= now)
+        .order_by(OutboxEmail.next_attempt_at)
+        .limit(limit)
+    )
+    rows = db.execute(
+        update(OutboxEmail)
+        .where(OutboxEmail.id.in_(due))
+        .values(next_attempt_at=now + LEASE)
+        .returning(
+            OutboxEmail.id,
+            OutboxEmail.to_email,
+            OutboxEmail.subject,
+            OutboxEmail.html_body,
+            OutboxEmail.attempts,
+        )
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.commit()
+    return list(rows)
+
+
+def mark_sent(db: Session, ids: list[int], now: datetime | None = None):
+    if not ids:
+        return
+    db.execute(
+        update(OutboxEmail)
+        .where(OutboxEmail.id.in_(ids))
+        .values(status="sent", sent_at=now or datetime.now(), last_error=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def mark_failed(
+    db: Session, failures: list[tuple[int, int, str]], now: datetime | None = None
+):
+    """
+    failures — (id, attempts до этой попытки, текст ошибки). Письмо
+    откладывается с экспоненциальной задержкой или уходит в dead.
+    """
+    if not failures:
+        return
+    now = now or datetime.now()
+    params = []
+    for id, attempts, error in failures:
+        attempts += 1
+        params.append(
+            {
+                "id": id,
+                "attempts": attempts,
+                "status": "dead" if attempts >= MAX_ATTEMPTS else "pending",
+                "next_attempt_at": now + retry_delay(attempts),
+                "last_error": error[:1000],
+            }
+        )
+    # bulk UPDATE по первичному ключу — один executemany
+    db.execute(update(OutboxEmail), params)
+    db.commit()
+
+
+def purge_sent(db: Session, now: datetime | None = None) -> int:
+    now = now or datetime.now()
+    purged = db.execute(
+        delete(OutboxEmail).where(
+            OutboxEmail.status == "sent",
+            OutboxEmail.sent_at < now - SENT_RETENTION,
+        )
+    ).rowcount  # pyright: ignore[reportAttributeAccessIssue]
+    db.commit()
+    return purged
@@ -0,0 +1,100 @@
+"""
+Процесс отправки писем из email_outbox (см. app/outbox.py).
+
+Запускается отдельно от API, рядом с ним:
+
+    python -m app.outbox_worker
+
+Пачка писем отправляется через одно SMTP-соединение: рукопожатие TLS
+и логин выполняются раз на пачку, а не на каждое письмо. Можно
+запустить несколько воркеров — пачки не пересекаются.
+"""
+
+import smtplib
+import time
+
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import sessionmaker
+
+from app.database import session
+from app.email_service import build_message, smtp_connection
+from app.logger import logger
+from app.outbox import claim_batch, mark_failed, mark_sent, purge_sent
+
+BATCH_SIZE = 50
+POLL_INTERVAL = 5.0  # секунды: пауза, когда очередь пуста
+
+# ошибки, относящиеся к одному письму: остальные в пачке отправляются
+MESSAGE_ERRORS = (
+    smtplib.SMTPRecipientsRefused,
+    smtplib.SMTPSenderRefused,
+    smtplib.SMTPDataError,
+)
+
+
+def deliver(rows: list[Row]) -> tuple[list[int], list[tuple[int, int, str]]]:
+    """
+    Отправляет пачку через одно соединение.
+    Возвращает id отправленных и (id, attempts, ошибка) неотправленных.
+    """
+    sent: list[int] = []
+    failed: list[tuple[int, int, str]] = []
+
+    try:
+        server = smtp_connection()
+    except Exception as e:
+        return sent, [(r.id, r.attempts, str(e)) for r in rows]
+
+    with server:
+        for i, r in enumerate(rows):
+            try:
+                server.send_message(build_message(r.to_email, r.subject, r.html_body))
+                sent.append(r.id)
+            except MESSAGE_ERRORS as e:
+                failed.append((r.id, r.attempts, str(e)))
+            except Exception as e:
+                # соединение потеряно — остаток пачки уходит на повтор
+                failed += [(x.id, x.attempts, str(e)) for x in rows[i:]]
+                break
+
+    return sent, failed
+
+
+def run_once(session_factory: sessionmaker = session) -> int:
+    """
+    Один проход: забрать пачку, отправить, записать результат.
+    Возвращает размер пачки.
+    """
+    with session_factory() as db:
+        rows = claim_batch(db, BATCH_SIZE)
+    if not rows:
+        return 0
+
+    sent, failed = deliver(rows)
+
+    with session_factory() as db:
+        mark_sent(db, sent)
+        mark_failed(db, failed)
+
+    logger.info(f"outbox: отправлено {len(sent)}, отложено {len(failed)}")
+    for id, _, error in failed:
+        logger.warning(f"outbox: письмо {id} не отправлено: {error}")
+    return len(rows)
+
+
+def run(session_factory: sessionmaker = session):
+    logger.info("outbox: воркер запущен")
+    while True:
+        try:
+            with session_factory() as db:
+                purge_sent(db)
+            # полная пачка — в очереди, скорее всего, есть ещё
+            while run_once(session_factory) == BATCH_SIZE:
+                pass
+        except Exception as e:
+            logger.error(f"outbox: ошибка прохода: {e}")
+        time.sleep(POLL_INTERVAL)
+
+
+if __name__ == "__main__":
+    run()
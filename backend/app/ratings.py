@@ -0,0 +1,88 @@
+"""
+Агрегаты рейтинга туров (таблица tour_ratings).
+
+Счётчики поддерживают триггеры SQLite на reviews: любая вставка,
+изменение или удаление отзыва — через ORM, bulk insert или сырой SQL —
+обновляет строку тура в той же транзакции. Сводка рейтинга на странице
+тура становится чтением одной строки по первичному ключу.
+
+reconcile_ratings пересчитывает таблицу с нуля (после ручных правок
+базы или для проверки). Запуск: python -m app.ratings
+"""
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+STARS = range(1, 6)
+
+
+def _star_columns(fmt: str) -> str:
+    return ", ".join(fmt.format(n=n) for n in STARS)
+
+
+def _add(row: str) -> str:
+    """
+    UPSERT, прибавляющий отзыв row (NEW) к агрегатам его тура
+    """
+    return (
+        "INSERT INTO tour_ratings "
+        f"(tour_id, total, rating_sum, {_star_columns('stars_{n}')}) "
+        f"VALUES ({row}.tour_id, 1, {row}.rating, "
+        f"{_star_columns(row + '.rating = {n}')}) "
+        "ON CONFLICT (tour_id) DO UPDATE SET "
+        "total = total + 1, rating_sum = rating_sum + excluded.rating_sum, "
+        f"{_star_columns('stars_{n} = stars_{n} + excluded.stars_{n}')};"
+    )
+
+
+def _subtract(row: str) -> str:
+    """
+    Вычитает отзыв row (OLD) из агрегатов его тура
+    """
+    return (
+        "UPDATE tour_ratings SET "
+        f"total = total - 1, rating_sum = rating_sum - {row}.rating, "
+        f"{_star_columns('stars_{n} = stars_{n} - (' + row + '.rating = {n})')} "
+        f"WHERE tour_id = {row}.tour_id;"
+    )
+
+
+TRIGGERS = {
+    "reviews_rating_insert": f"AFTER INSERT ON reviews BEGIN {_add('NEW')} END",
+    "reviews_rating_delete": f"AFTER DELETE ON reviews BEGIN {_subtract('OLD')} END",
+    "reviews_rating_update": (
+        "AFTER UPDATE OF tour_id, rating ON reviews "
+        f"BEGIN {_subtract('OLD')} {_add('NEW')} END"
+    ),
+}
+
+
+def create_rating_triggers(conn: Connection):
+    for name, body in TRIGGERS.items():
+        conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {name} {body}"))
+
+
+def reconcile_ratings(conn: Connection | Session):
+    """
+    Пересчитывает tour_ratings целиком по таблице reviews
+    """
+    conn.execute(text("DELETE FROM tour_ratings"))
+    conn.execute(
+        text(
+            "INSERT INTO tour_ratings "
+            f"(tour_id, total, rating_sum, {_star_columns('stars_{n}')}) "
+            "SELECT tour_id, count(*), sum(rating), "
+            f"{_star_columns('sum(rating = {n})')} "
+            "FROM reviews GROUP BY tour_id"
+        )
+    )
+
+
+if __name__ == "__main__":
+    from app.database import session
+
+    with session() as db:
+        reconcile_ratings(db)
+        db.commit()
+    print("Рейтинги туров пересчитаны")
@@ -0,0 +1,194 @@
+"""
+Контентные рекомендации туров.
+
+Пакетная задача считает сходство каждой пары туров по:
+- тексту: косинус TF-IDF векторов описания и "что включено";
+- географии: exp(-расстояние / GEO_SCALE_KM);
+- цене: exp(-|ln цена_i - ln цена_j|) для одной валюты, иначе 0;
+- рейтингу кандидата: средняя оценка / 5.
+
+Для каждого тура сохраняются RECOMMENDATIONS_K лучших соседей в таблицу
+tour_recommendations, и get_tour читает k идентификаторов вместо
+сканирования каталога. Матрица сходства строится блоками строк, чтобы
+память не росла как n².
+
+Запуск: python -m app.recommend
+"""
+
+import math
+from collections import Counter
+
+import numpy as np
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session, load_only
+
+from app.models.booking import Booking
+from app.models.recommendation import TourRecommendation
+from app.models.review import Review
+from app.models.tour import Tour
+from app.search import stem_text
+
+RECOMMENDATIONS_K = 6
+BLOCK_SIZE = 512
+MAX_FEATURES = 2000  # словарь TF-IDF: самые частые по документам основы
+GEO_SCALE_KM = 300.0
+
+WEIGHT_TEXT = 0.5
+WEIGHT_GEO = 0.25
+WEIGHT_PRICE = 0.15
+WEIGHT_RATING = 0.1
+
+
+def _tfidf(documents: list[list[str]]) -> np.ndarray:
+    """
+    L2-нормированная TF-IDF матрица (туры x словарь)
+    """
+    document_frequency = Counter(token for tokens in documents for token in set(tokens))
+    vocabulary = {
+        token: i
+        for i, (token, _) in enumerate(document_frequency.most_common(MAX_FEATURES))
+    }
+
+    tf = np.zeros((len(documents), max(len(vocabulary), 1)), dtype=np.float32)
+    for row, tokens in enumerate(documents):
+        for token, count in Counter(tokens).items():
+            if token in vocabulary:
+                tf[row, vocabulary[token]] = count
+
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log((1 + len(documents)) / (1 + df)) + 1
+    matrix = np.log1p(tf) * idf
+
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms
+
+
+def _haversine_km(lat1, long1, lat2, long2) -> np.ndarray:
+    lat1, long1, lat2, long2 = map(np.radians, (lat1, long1, lat2, long2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((long2 - long1) / 2) ** 2
+    )
+    return 2 * 6371.0 * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def compute_recommendations(
+    db: Session, k: int = RECOMMENDATIONS_K
+) -> dict[str, list[tuple[str, float]]]:
+    tours = (
+        db.query(Tour)
+        .options(
+            load_only(
+                Tour.id, Tour.description, Tour.included, Tour.map_lat, Tour.map_long  # pyright: ignore[reportArgumentType]
+            )
+        )
+        .order_by(Tour.id)
+        .all()
+    )
+    if len(tours) < 2:
+        return {}
+
+    ids = [str(t.id) for t in tours]
+    position = {tour_id: i for i, tour_id in enumerate(ids)}
+    n = len(ids)
+
+    # ---------- признаки ----------
+    text_matrix = _tfidf(
+        [
+            stem_text(" ".join((t.description or []) + (t.included or []))).split()
+            for t in tours
+        ]
+    )
+
+    lat = np.array([t.map_lat if t.map_lat is not None else np.nan for t in tours])
+    long = np.array([t.map_long if t.map_long is not None else np.nan for t in tours])
+
+    log_cost = np.full(n, np.nan)
+    currency = np.full(n, -1)
+    currency_codes: dict[str, int] = {}
+    for tour_id, cost, cur in db.query(Booking.tour_id, Booking.cost, Booking.currency):
+        if tour_id in position:
+            log_cost[position[tour_id]] = math.log1p(cost)
+            currency[position[tour_id]] = currency_codes.setdefault(cur, len(currency_codes))
+
+    rating = np.zeros(n)
+    for tour_id, avg in (
+        db.query(Review.tour_id, func.avg(Review.rating)).group_by(Review.tour_id)
+    ):
+        if tour_id in position:
+            rating[position[tour_id]] = float(avg) / 5
+
+    # ---------- сходство блоками ----------
+    k = min(k, n - 1)
+    result: dict[str, list[tuple[str, float]]] = {}
+
+    for start in range(0, n, BLOCK_SIZE):
+        rows = slice(start, min(start + BLOCK_SIZE, n))
+
+        text_sim = text_matrix[rows] @ text_matrix.T
+
+        distance = _haversine_km(lat[rows, None], long[rows, None], lat[None, :], long[None, :])
+        geo_sim = np.nan_to_num(np.exp(-distance / GEO_SCALE_KM))
+
+        same_currency = (currency[rows, None] == currency[None, :]) & (currency[rows, None] >= 0)
+        price_sim = np.where(
+            same_currency,
+            np.nan_to_num(np.exp(-np.abs(log_cost[rows, None] - log_cost[None, :]))),
+            0.0,
+        )
+
+        score = (
+            WEIGHT_TEXT * text_sim
+            + WEIGHT_GEO * geo_sim
+            + WEIGHT_PRICE * price_sim
+            + WEIGHT_RATING * rating[None, :]
+        )
+
+        # тур не рекомендует сам себя
+        block_rows = np.arange(rows.stop - rows.start)
+        score[block_rows, block_rows + start] = -np.inf
+
+        top = np.argpartition(-score, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(score, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        for i, row in enumerate(range(rows.start, rows.stop)):
+            result[ids[row]] = [
+                (ids[j], float(s)) for j, s in zip(top[i], top_scores[i])
+            ]
+
+    return result
+
+
+def rebuild_recommendations(db: Session, k: int = RECOMMENDATIONS_K):
+    """
+    Пересчитывает и перезаписывает таблицу tour_recommendations
+    """
+    recommendations = compute_recommendations(db, k)
+
+    rows = [
+        {
+            "tour_id": tour_id,
+            "position": pos,
+            "recommended_id": recommended_id,
+            "score": score,
+        }
+        for tour_id, items in recommendations.items()
+        for pos, (recommended_id, score) in enumerate(items)
+    ]
+
+    db.query(TourRecommendation).delete()
+    if rows:
+        db.execute(insert(TourRecommendation), rows)
+    db.commit()
+
+
+if __name__ == "__main__":
+    from app.database import session
+
+    with session() as db:
+        rebuild_recommendations(db)
+    print("Рекомендации пересчитаны")
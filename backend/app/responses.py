@@ -0,0 +1,20 @@
+from fastapi import Response
+from pydantic import BaseModel
+
+
+class PreEncodedJSONResponse(Response):
+    """
+    Ответ с уже сериализованным JSON: FastAPI не валидирует
+    и не кодирует тело повторно
+    """
+
+    media_type = "application/json"
+
+
+def dump_json(model: BaseModel, **kwargs) -> bytes:
+    """
+    Сериализует модель сразу в байты, без промежуточной строки.
+    Подходит и для моделей, собранных через model_construct
+    из доверенных данных (БД), — валидация при этом не выполняется.
+    """
+    return model.__pydantic_serializer__.to_json(model, **kwargs)
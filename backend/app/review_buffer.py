@@ -0,0 +1,109 @@
+"""
+Буфер новых отзывов с отложенной записью.
+
+После окончания тура отзывы приходят пачками, и вставка каждого
+отдельной транзакцией держала бы блокировку записи SQLite на каждом
+запросе. Принятые отзывы копятся в памяти процесса и записываются
+одним executemany, когда набирается BATCH_SIZE штук или проходит
+FLUSH_INTERVAL секунд. Агрегаты tour_ratings обновляют триггеры в той
+же транзакции, кэш страниц отзывов сбрасывается один раз на тур за
+сброс буфера.
+"""
+
+import atexit
+from threading import Event, Lock, Thread
+
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from app.cache import invalidate_reviews
+from app.database import session
+from app.logger import logger
+from app.models.review import Review
+
+BATCH_SIZE = 100
+FLUSH_INTERVAL = 2.0  # секунды
+
+
+class ReviewBuffer:
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        batch_size: int = BATCH_SIZE,
+        flush_interval: float = FLUSH_INTERVAL,
+    ):
+        self._session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._pending: list[dict] = []
+        self._lock = Lock()  # защищает _pending
+        self._flush_lock = Lock()  # сбросы идут по одному
+        self._wakeup = Event()
+        self._thread: Thread | None = None
+
+    def add(self, review: dict):
+        """
+        Ставит отзыв (словарь колонок Review) в очередь на запись
+        """
+        with self._lock:
+            self._pending.append(review)
+            full = len(self._pending) >= self.batch_size
+
+            if self._thread is None:
+                self._thread = Thread(
+                    target=self._run, name="review-buffer", daemon=True
+                )
+                self._thread.start()
+
+        if full:
+            self._wakeup.set()
+
+    def is_pending(self, tour_id: str, user_id: int) -> bool:
+        with self._lock:
+            return any(
+                r["tour_id"] == tour_id and r["user_id"] == user_id
+                for r in self._pending
+            )
+
+    def flush(self) -> int:
+        """
+        Записывает накопленные отзывы одной транзакцией, возвращает их число
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+
+            try:
+                with self._session_factory() as db:
+                    # повторный отзыв того же пользователя отсекает
+                    # уникальный индекс (tour_id, user_id)
+                    db.execute(insert(Review).prefix_with("OR IGNORE"), batch)
+                    db.commit()
+            except Exception:
+                # возвращаем пачку в начало очереди до следующей попытки
+                with self._lock:
+                    self._pending[:0] = batch
+                raise
+
+        for tour_id in {r["tour_id"] for r in batch}:
+            invalidate_reviews(tour_id)
+
+        return len(batch)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"ошибка записи буфера отзывов: {e}")
+
+
+review_buffer = ReviewBuffer(session)
+
+# при остановке процесса дописываем то, что не успел сбросить поток
+atexit.register(review_buffer.flush)
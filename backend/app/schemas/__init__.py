@@ -2,5 +2,5 @@ from .auth import LoginRequest, RegisterRequest, TokenResponse
 from .subscribe import SubscribeRequest
 from .support import SupportRequest
 from .user import UpdateProfileRequest, UserProfile
-from .review import ReviewsSchema
+from .review import ReviewCreate, ReviewsSchema
 from .order import OrderCreate, OrderResponse, Orders
\ No newline at end of file
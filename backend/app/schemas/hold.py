@@ -0,0 +1,15 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class SeatHoldCreate(BaseModel):
+    booking_date_id: int
+    seats: int = Field(ge=1, description="Количество мест должно быть не меньше 1")
+
+
+class SeatHoldResponse(BaseModel):
+    hold_id: int
+    booking_date_id: int
+    seats: int
+    expires_at: datetime
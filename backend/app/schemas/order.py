@@ -1,6 +1,6 @@
 from enum import Enum
 from pydantic import BaseModel, EmailStr, Field, RootModel, field_validator
-from datetime import date
+from datetime import date, datetime
 
 
 class Gender(str, Enum):
@@ -57,6 +57,8 @@ class OrderCreate(BaseModel):
     )
     primary_traveler: PrimaryTraveler
     additional_travelers: AdditionalTravelers | None = None
+    # бронь мест, полученная через POST /api/holds
+    hold_id: int | None = None
 
 
 # Схема ответа
@@ -79,6 +81,13 @@ class OrderSchema(BaseModel):
     primary_traveler: PrimaryTraveler
     additional_travelers: AdditionalTravelers | None
 
+    created_at: datetime
+    # данные тура и даты — из узкого JOIN, без загрузки сущностей
+    tour_title: str
+    tour_img: str
+    date_range: str
 
-class Orders(RootModel[list[OrderSchema]]):
-    pass
+
+class Orders(BaseModel):
+    items: list[OrderSchema]
+    nextCursor: str | None
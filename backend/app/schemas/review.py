@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 class ReviewItem(BaseModel):
     id: int
@@ -9,4 +9,10 @@ class ReviewItem(BaseModel):
 
 class ReviewsSchema(BaseModel):
     reviews: list[ReviewItem]
-    hasMore: bool
\ No newline at end of file
+    hasMore: bool
+    nextCursor: str | None = None
+
+class ReviewCreate(BaseModel):
+    tourId: str
+    rating: int = Field(ge=1, le=5)
+    text: str = Field(min_length=1, max_length=5000)
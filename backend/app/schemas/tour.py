@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, RootModel
 
 
 class ImportantInfoItem(BaseModel):
@@ -31,6 +31,9 @@ class Booking(BaseModel):
     days: int
     prepayment: int
     maxSeats: int
+
+
+class TourAvailability(BaseModel):
     dates: list[BookingDateItem]
 
 
@@ -56,6 +59,8 @@ class RecommendedCardItem(BaseModel):
     img: str
     price: int
     currency: str
+    rating: float
+    reviewCount: int
 
 
 class TourSchema(BaseModel):
@@ -73,3 +78,40 @@ class TourSchema(BaseModel):
     map: dict
     reviews: Reviews
     recommendedCards: list[RecommendedCardItem]
+
+
+class TourCatalogItem(BaseModel):
+    id: str
+    title: str | None = None
+    img: str | None = None
+    images: list[str] | None = None
+    description: list[str] | None = None
+    organizer: Organizer | None = None
+    map: dict | None = None
+    price: int | None = None
+    currency: str | None = None
+    days: int | None = None
+
+
+class TourCatalog(BaseModel):
+    items: list[TourCatalogItem]
+    nextCursor: str | None
+
+
+class GeoTourItem(RecommendedCardItem):
+    id: str
+    lat: float
+    long: float
+    distanceKm: float | None = None
+
+
+class GeoTours(RootModel[list[GeoTourItem]]):
+    pass
+
+
+class SearchTourItem(RecommendedCardItem):
+    id: str
+
+
+class SearchTours(RootModel[list[SearchTourItem]]):
+    pass
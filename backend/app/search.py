@@ -0,0 +1,219 @@
+import re
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, undefer_group
+
+from app.models.tour import Tour
+
+# ---------- русский стеммер (Snowball) ----------
+#
+# FTS5 из коробки умеет только английский porter, поэтому текст
+# стеммится на стороне Python: в индекс попадают основы слов, и запрос
+# "озёрам" находит "озеро", "озера" и т.д.
+
+_VOWELS = "аеиоуыэюя"
+
+_PERFECTIVE_GERUND = (
+    ("вшись", "вши", "в"),  # после а/я
+    ("ившись", "ывшись", "ивши", "ывши", "ив", "ыв"),
+)
+_REFLEXIVE = ("ся", "сь")
+_ADJECTIVE = (
+    "ими", "ыми", "его", "ого", "ему", "ому",
+    "ее", "ие", "ые", "ое", "ей", "ий", "ый", "ой", "ем", "им", "ым", "ом",
+    "их", "ых", "ую", "юю", "ая", "яя", "ою", "ею",
+)
+_PARTICIPLE = (
+    ("ем", "нн", "вш", "ющ", "щ"),  # после а/я
+    ("ивш", "ывш", "ующ"),
+)
+_VERB = (
+    ("ете", "йте", "ешь", "нно", "ла", "на", "ли", "ем", "ло", "но", "ет",
+     "ют", "ны", "ть", "й", "л", "н"),  # после а/я
+    ("уйте", "ейте", "ила", "ыла", "ена", "ите", "или", "ыли", "ило", "ыло",
+     "ено", "ует", "уют", "ены", "ить", "ыть", "ишь", "ей", "уй", "ил", "ыл",
+     "им", "ым", "ен", "ят", "ит", "ыт", "ую", "ю"),
+)
+_NOUN = (
+    "иями", "ями", "ами", "ией", "иям", "ием", "иях",
+    "ев", "ов", "ие", "ье", "еи", "ии", "ей", "ой", "ий", "ям", "ем", "ам",
+    "ом", "ах", "ях", "ию", "ью", "ия", "ья",
+    "а", "е", "и", "й", "о", "у", "ы", "ь", "ю", "я",
+)
+_SUPERLATIVE = ("ейше", "ейш")
+_DERIVATIONAL = ("ость", "ост")
+
+
+def _regions(word: str) -> tuple[int, int]:
+    """
+    Начала областей RV и R2 (индексы в слове)
+    """
+    rv = len(word)
+    for i, ch in enumerate(word):
+        if ch in _VOWELS:
+            rv = i + 1
+            break
+
+    def next_region(start: int) -> int:
+        for i in range(start + 1, len(word)):
+            if word[i] not in _VOWELS and word[i - 1] in _VOWELS:
+                return i + 1
+        return len(word)
+
+    r1 = next_region(0)
+    r2 = next_region(r1)
+    return rv, r2
+
+
+def _strip(word: str, start: int, endings, after_a: bool = False) -> str | None:
+    for ending in sorted(endings, key=len, reverse=True):
+        if not word.endswith(ending) or len(word) - len(ending) < start:
+            continue
+        if after_a:
+            pos = len(word) - len(ending) - 1
+            if pos < start or word[pos] not in "ая":
+                continue
+        return word[: len(word) - len(ending)]
+    return None
+
+
+def _strip_grouped(word: str, start: int, groups) -> str | None:
+    first, second = groups
+    candidates = [
+        c for c in (_strip(word, start, first, after_a=True), _strip(word, start, second))
+        if c is not None
+    ]
+    return min(candidates, key=len) if candidates else None
+
+
+def stem(word: str) -> str:
+    word = word.lower().replace("ё", "е")
+    if not re.fullmatch(r"[а-я]+", word):
+        return word
+
+    rv, r2 = _regions(word)
+
+    # Шаг 1
+    stripped = _strip_grouped(word, rv, _PERFECTIVE_GERUND)
+    if stripped is not None:
+        word = stripped
+    else:
+        word = _strip(word, rv, _REFLEXIVE) or word
+
+        adjective = _strip(word, rv, _ADJECTIVE)
+        if adjective is not None:
+            word = _strip_grouped(adjective, rv, _PARTICIPLE) or adjective
+        else:
+            verb = _strip_grouped(word, rv, _VERB)
+            if verb is not None:
+                word = verb
+            else:
+                noun = _strip(word, rv, _NOUN)
+                if noun is not None:
+                    word = noun
+
+    # Шаг 2
+    if word.endswith("и") and len(word) - 1 >= rv:
+        word = word[:-1]
+
+    # Шаг 3
+    word = _strip(word, r2, _DERIVATIONAL) or word
+
+    # Шаг 4
+    if word.endswith("нн") and len(word) - 2 >= rv:
+        word = word[:-1]
+    else:
+        superlative = _strip(word, rv, _SUPERLATIVE)
+        if superlative is not None:
+            word = superlative
+            if word.endswith("нн"):
+                word = word[:-1]
+        elif word.endswith("ь") and len(word) - 1 >= rv:
+            word = word[:-1]
+
+    return word
+
+
+def stem_text(value: str) -> str:
+    return " ".join(stem(w) for w in re.findall(r"\w+", value.lower()))
+
+
+# ---------- FTS5 индекс ----------
+
+
+def create_search_index(engine: Engine):
+    """
+    Создаёт виртуальную таблицу FTS5. create_all её не знает,
+    поэтому вызывается отдельно при старте приложения.
+    """
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS tours_fts USING fts5("
+                "tour_id UNINDEXED, title, body, "
+                "tokenize = 'unicode61 remove_diacritics 2')"
+            )
+        )
+
+
+def _tour_text(tour: Tour) -> str:
+    parts: list[str] = [str(tour.map_popup or "")]
+    for column in (tour.description, tour.included, tour.excluded, tour.what_to_bring):
+        parts += column or []
+    for item in tour.important_info or []:
+        parts += [item.get("title", ""), item.get("text", "")]
+    for item in tour.faq or []:
+        parts += [item.get("question", ""), item.get("answer", "")]
+    return " ".join(parts)
+
+
+def index_tour(db: Session, tour: Tour):
+    """
+    Обновляет запись тура в поисковом индексе (в текущей транзакции)
+    """
+    db.execute(text("DELETE FROM tours_fts WHERE tour_id = :id"), {"id": tour.id})
+    db.execute(
+        text("INSERT INTO tours_fts (tour_id, title, body) VALUES (:id, :title, :body)"),
+        {
+            "id": tour.id,
+            "title": stem_text(str(tour.title)),
+            "body": stem_text(_tour_text(tour)),
+        },
+    )
+
+
+def sync_search_index(db: Session):
+    """
+    Переиндексирует каталог, если индекс пуст или разошёлся с таблицей туров
+    """
+    indexed = db.execute(text("SELECT count(*) FROM tours_fts")).scalar_one()
+    total = db.query(Tour).count()
+    if indexed == total:
+        return
+
+    db.execute(text("DELETE FROM tours_fts"))
+    for tour in db.query(Tour).options(undefer_group("content")).all():
+        index_tour(db, tour)
+    db.commit()
+
+
+def search_tours(db: Session, query: str, limit: int) -> list[tuple[str, float]]:
+    """
+    Поиск по каталогу: [(tour_id, bm25)], лучшие первыми.
+    Каждое слово запроса ищется как префикс своей основы.
+    """
+    terms = [stem(w) for w in re.findall(r"\w+", query.lower())]
+    match = " ".join(f'"{t}"*' for t in terms if t)
+    if not match:
+        return []
+
+    rows = db.execute(
+        text(
+            "SELECT tour_id, bm25(tours_fts, 0.0, 10.0, 1.0) AS score "
+            "FROM tours_fts WHERE tours_fts MATCH :match "
+            "ORDER BY score LIMIT :limit"
+        ),
+        {"match": match, "limit": limit},
+    ).all()
+    return [(tour_id, score) for tour_id, score in rows]
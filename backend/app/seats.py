@@ -0,0 +1,61 @@
+"""
+Списание и возврат мест на датах тура.
+
+Проверка и запись выполняются одним условным UPDATE внутри SQLite,
+поэтому параллельные заказы и брони не продают больше мест, чем есть.
+"""
+
+import time
+from typing import Callable, TypeVar
+
+from sqlalchemy import update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.models.booking import BookingDate
+
+T = TypeVar("T")
+
+# Повторы транзакции, если SQLite не дождался блокировки записи
+# за busy timeout соединения
+LOCK_RETRIES = 3
+LOCK_RETRY_DELAY = 0.05  # секунды, удваивается с каждой попыткой
+
+
+def reserve_seats(db: Session, booking_date_id: int, count: int) -> bool:
+    """
+    Атомарно списывает count мест; False, если свободных мест меньше
+    """
+    result = db.execute(
+        update(BookingDate)
+        .where(BookingDate.id == booking_date_id, BookingDate.seats >= count)
+        .values(seats=BookingDate.seats - count)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1  # pyright: ignore[reportAttributeAccessIssue]
+
+
+def release_seats(db: Session, booking_date_id: int, count: int):
+    db.execute(
+        update(BookingDate)
+        .where(BookingDate.id == booking_date_id)
+        .values(seats=BookingDate.seats + count)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def with_lock_retries(db: Session, transaction: Callable[[], T]) -> T:
+    """
+    Выполняет transaction (она сама делает commit), повторяя её, если
+    база занята другим писателем
+    """
+    attempt = 0
+    while True:
+        try:
+            return transaction()
+        except OperationalError as e:
+            db.rollback()
+            if "locked" not in str(e.orig) or attempt == LOCK_RETRIES:
+                raise
+            time.sleep(LOCK_RETRY_DELAY * 2**attempt)
+            attempt += 1
@@ -65,3 +65,10 @@ async def get_current_user(
     if not bool(user.is_active):
         raise HTTPException(status_code=400, detail="Email не подтверждён")
     return user
+
+
+async def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+    # отдельных ролей нет: администратор — владелец адреса SMTP.ADMIN
+    if str(current_user.email).lower() != settings.SMTP.ADMIN.lower():
+        raise HTTPException(status_code=403, detail="Недостаточно прав")
+    return current_user
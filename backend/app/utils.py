@@ -1,9 +1,11 @@
 from datetime import datetime, date
+from typing import Iterable
+import hashlib
 
-from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from app.models.review import Review
+from app.models.rating import TourRating
+from app.ratings import STARS
 
 def format_date_range(start_date: date, end_date: date) -> str:
     """
@@ -54,28 +56,54 @@ def parse_review_date(date_str):
     return datetime.strptime(date_str, "%d.%m.%Y").date()
 
 
-def get_rating_summary(db: Session, tour_id: str):
-    total, avg = (
-        db.query(
-            func.count(Review.id),
-            func.avg(Review.rating)
-        )
-        .filter(Review.tour_id == tour_id)
-        .one()
-    )
+def _summary(rating: TourRating | None) -> dict:
+    total: int = rating.total if rating else 0  # pyright: ignore[reportAssignmentType]
+    if not total:
+        return {"totalReviews": 0, "average": 0.0, "ratings": []}
 
-    stars = (
-        db.query(
-            Review.rating,
-            func.count(Review.id)
-        )
-        .filter(Review.tour_id == tour_id)
-        .group_by(Review.rating)
-        .all()
-    )
+    rating_sum: int = rating.rating_sum  # pyright: ignore[reportAssignmentType, reportOptionalMemberAccess]
+    stars = [(n, getattr(rating, f"stars_{n}")) for n in STARS]
 
     return {
         "totalReviews": total,
-        "average": round(float(avg or 0), 1),
-        "ratings": [{"stars": rating, "count": count} for rating, count in stars]
+        "average": round(rating_sum / total, 1),
+        "ratings": [{"stars": n, "count": count} for n, count in stars if count]
+    }
+
+
+def get_rating_summary(db: Session, tour_id: str):
+    """
+    Сводка рейтинга из агрегатов tour_ratings — одно чтение по
+    первичному ключу вместо GROUP BY по всем отзывам тура
+    """
+    return _summary(db.get(TourRating, tour_id))
+
+
+def get_rating_summaries(db: Session, tour_ids: Iterable[str]) -> dict[str, dict]:
+    """
+    Сводки рейтинга для набора туров одним запросом (IN по tour_ratings).
+    Туры без отзывов получают пустую сводку.
+    """
+    tour_ids = set(tour_ids)
+    ratings = {
+        str(r.tour_id): r
+        for r in db.query(TourRating).filter(TourRating.tour_id.in_(tour_ids))
     }
+    return {tour_id: _summary(ratings.get(tour_id)) for tour_id in tour_ids}
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Проверяет заголовок If-None-Match (слабое сравнение, RFC 9110)
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    candidates = (c.strip().removeprefix("W/") for c in if_none_match.split(","))
+    return etag.removeprefix("W/") in candidates
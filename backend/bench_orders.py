@@ -0,0 +1,111 @@
+"""
+Нагрузочная проверка списания мест: сотни параллельных заказов на одну
+дату во временной базе SQLite.
+
+Проверяет, что продано не больше мест, чем было, и что остаток в
+booking_dates сходится с суммой заказов, а на каждый заказ в outbox
+лежит ровно одно письмо; печатает пропускную способность.
+
+Запуск: python bench_orders.py [заказов] [потоков]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from app.api.order import create_order
+from app.models import Base, Booking, BookingDate, Order, OutboxEmail, Tour, User
+from app.schemas.order import OrderCreate
+
+SEATS = 100
+
+
+def main(orders: int, workers: int):
+    path = os.path.join(tempfile.mkdtemp(), "bench_orders.db")
+    engine = create_engine(
+        f"sqlite:///{path}", connect_args={"check_same_thread": False}
+    )
+    session = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    Base.metadata.create_all(bind=engine)
+
+    with session() as db:
+        db.add(Tour(id="bench", title="Bench", images=["bench.jpg"]))
+        booking = Booking(
+            tour_id="bench", cost=1000, currency="₸", days=1, prepayment=100,
+            max_seats=SEATS,
+        )
+        db.add(booking)
+        db.flush()
+        booking_date = BookingDate(
+            booking_id=booking.id,
+            start_date=date.today() + timedelta(days=30),
+            price=1000,
+            seats=SEATS,
+        )
+        users = [
+            User(email=f"user{i}@example.com", hashed_password="-", is_active=True)
+            for i in range(orders)
+        ]
+        db.add(booking_date)
+        db.add_all(users)
+        db.commit()
+        booking_date_id = booking_date.id
+        user_ids = [u.id for u in users]
+
+    def place(i: int) -> int:
+        data = OrderCreate(
+            tour_id="bench",
+            booking_date_id=booking_date_id,  # pyright: ignore[reportArgumentType]
+            participants_count=1 + i % 3,
+            primary_traveler={  # pyright: ignore[reportArgumentType]
+                "firstName": "Bench",
+                "lastName": "User",
+                "email": f"user{i}@example.com",
+                "phone": "+70000000000",
+                "dob": "1990-01-01",
+                "gender": "male",
+            },
+        )
+        with session() as db:
+            user = db.get(User, user_ids[i])
+            try:
+                create_order(db, data, user)  # pyright: ignore[reportArgumentType]
+            except HTTPException:
+                return 0
+            return data.participants_count
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        sold = list(pool.map(place, range(orders)))
+    elapsed = time.perf_counter() - started
+
+    with session() as db:
+        seats_left: int = db.get(BookingDate, booking_date_id).seats  # pyright: ignore[reportOptionalMemberAccess, reportAssignmentType]
+        ordered = db.query(func.coalesce(func.sum(Order.participants_count), 0)).scalar()
+        emails = db.query(func.count(OutboxEmail.id)).scalar()
+
+    accepted = sum(1 for s in sold if s)
+    print(f"заказов: {orders}, потоков: {workers}, мест: {SEATS}")
+    print(f"принято: {accepted}, отказов: {orders - accepted}")
+    print(f"продано мест: {ordered}, осталось: {seats_left}")
+    print(f"{elapsed:.2f} с, {orders / elapsed:.0f} заказов/с")
+
+    assert ordered == sum(sold), "заказы и списанные места разошлись"
+    assert ordered + seats_left == SEATS, "остаток мест не сходится"
+    assert seats_left >= 0, "продано больше мест, чем было"
+    assert emails == accepted, "письма в outbox не совпадают с заказами"
+    print("перепродаж нет")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 32,
+    )
@@ -0,0 +1,111 @@
+"""
+Микро-бенчмарк пути чтения тура на реальных данных из tours.json.
+
+Сравнивает:
+- старый путь: TourSchema(**tour_dict) в обработчике, затем повторная
+  валидация по response_model и кодирование через jsonable_encoder/json.dumps;
+- новый путь: одна валидация при сборке кэша и выдача готовых байтов.
+
+Запуск: python bench_serialization.py
+"""
+
+import json
+import timeit
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.responses import dump_json
+from app.schemas.tour import TourSchema
+
+ROUNDS = 2000
+
+
+def load_tour_dicts(json_path: str) -> list[dict]:
+    with open(json_path, "r", encoding="utf-8") as f:
+        lst = json.load(f)
+
+    # карточки рекомендаций несут рейтинг тура: (средняя, число отзывов)
+    card_ratings = {}
+    for data in lst:
+        ratings = [r["rating"] for r in data.get("reviews", [])]
+        card_ratings[f"/tours/{data['id']}"] = (
+            round(sum(ratings) / len(ratings), 1) if ratings else 0.0,
+            len(ratings),
+        )
+
+    tour_dicts = []
+    for data in lst:
+        stars: dict[int, int] = {}
+        for r in data.get("reviews", []):
+            stars[r["rating"]] = stars.get(r["rating"], 0) + 1
+        total = sum(stars.values())
+
+        recommended_cards = [
+            {
+                **card,
+                "rating": card_ratings.get(card["url"], (0.0, 0))[0],
+                "reviewCount": card_ratings.get(card["url"], (0.0, 0))[1],
+            }
+            for card in data.get("recommendedCards", [])
+        ]
+
+        # даты и места отдаются отдельно через /api/tours/availability
+        booking = {k: v for k, v in data["booking"].items() if k != "dates"}
+
+        tour_dicts.append(
+            {
+                **{k: data[k] for k in (
+                    "id", "title", "images", "included", "excluded",
+                    "whatToBring", "importantInfo", "faq", "organizer",
+                    "description", "map",
+                )},
+                "recommendedCards": recommended_cards,
+                "booking": booking,
+                "reviews": {
+                    "url": f"/api/reviews?tourId={data['id']}",
+                    "ratingSummary": {
+                        "totalReviews": total,
+                        "average": round(
+                            sum(s * c for s, c in stars.items()) / total, 1
+                        ) if total else 0.0,
+                        "ratings": [
+                            {"stars": s, "count": c} for s, c in sorted(stars.items())
+                        ],
+                    },
+                },
+            }
+        )
+
+    return tour_dicts
+
+
+def old_path(tour_dict: dict, adapter: TypeAdapter) -> bytes:
+    tour = TourSchema(**tour_dict)
+    # то, что делал FastAPI для response_model=TourSchema
+    validated = adapter.validate_python(tour, from_attributes=True)
+    content = jsonable_encoder(adapter.dump_python(validated, mode="json"))
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def new_path_build(tour_dict: dict) -> bytes:
+    return dump_json(TourSchema(**tour_dict))
+
+
+if __name__ == "__main__":
+    tour_dicts = load_tour_dicts("tours.json")
+    adapter = TypeAdapter(TourSchema)
+    cache = {d["id"]: new_path_build(d) for d in tour_dicts}
+
+    print(f"{'tour':<10} {'bytes':>7} {'old, мкс':>10} {'build, мкс':>11} {'hit, мкс':>9}")
+    for d in tour_dicts:
+        old = timeit.timeit(lambda: old_path(d, adapter), number=ROUNDS)
+        build = timeit.timeit(lambda: new_path_build(d), number=ROUNDS)
+        hit = timeit.timeit(lambda: cache.get(d["id"]), number=ROUNDS)
+        print(
+            f"{d['id']:<10} {len(cache[d['id']]):>7} "
+            f"{old / ROUNDS * 1e6:>10.1f} {build / ROUNDS * 1e6:>11.1f} "
+            f"{hit / ROUNDS * 1e6:>9.3f}"
+        )
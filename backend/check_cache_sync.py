@@ -0,0 +1,119 @@
+"""
+Проверка сброса кэшей API изменениями из другого процесса.
+
+API работает в этом процессе на временной базе SQLite, а каталог и
+отзывы меняет отдельный процесс — так же, как python json_db.py рядом
+с запущенным сервером. После VERSION_CHECK_INTERVAL ответы API должны
+отражать изменения.
+
+Запуск: python check_cache_sync.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+path = os.path.join(tempfile.mkdtemp(), "check_cache_sync.db")
+os.environ["DB__URL"] = f"sqlite:///{path}"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.cache_versions import VERSION_CHECK_INTERVAL  # noqa: E402
+from main import app  # noqa: E402
+
+TOUR_ID = "baikonur"
+WORLD = {"south": -90, "west": -180, "north": 90, "east": 180}
+
+with open("tours.json", encoding="utf-8") as f:
+    TOURS = len(json.load(f))
+
+LOAD_CATALOG = """
+from json_db import load_tour_from_json
+from app.database import session
+load_tour_from_json(session(), "tours.json")
+"""
+
+CHANGE_TOUR = f"""
+from datetime import date
+from sqlalchemy import text
+from app.database import engine
+with engine.begin() as conn:
+    conn.execute(text("UPDATE tours SET title = 'Новое название' WHERE id = '{TOUR_ID}'"))
+    conn.execute(
+        text(
+            "INSERT INTO reviews (tour_id, name, date, rating, text) "
+            "VALUES ('{TOUR_ID}', 'Проверка', :date, 1, 'Отзыв из другого процесса')"
+        ),
+        {{"date": date(2100, 1, 1)}},
+    )
+"""
+
+CHANGE_RECOMMENDATIONS = f"""
+from sqlalchemy import text
+from app.database import engine
+with engine.begin() as conn:
+    conn.execute(
+        text(
+            "UPDATE tour_recommendations SET recommended_id = ("
+            "SELECT recommended_id FROM tour_recommendations "
+            "WHERE tour_id = '{TOUR_ID}' AND position = 1) "
+            "WHERE tour_id = '{TOUR_ID}' AND position = 0"
+        )
+    )
+"""
+
+
+def run_in_other_process(code: str):
+    subprocess.run([sys.executable, "-c", code], check=True, env=os.environ)
+    # API сверяет счётчики не чаще раза в VERSION_CHECK_INTERVAL
+    time.sleep(VERSION_CHECK_INTERVAL + 0.1)
+
+
+def main():
+    with TestClient(app) as client:
+        # пустой каталог: API успевает закэшировать пустые ответы
+        assert client.get("/api/tours", params={"tourId": TOUR_ID}).status_code == 404
+        assert client.get("/api/tours/search", params={"q": "байконур"}).json() == []
+        assert client.get("/api/tours/bbox", params=WORLD).json() == []
+
+        run_in_other_process(LOAD_CATALOG)
+
+        tour = client.get("/api/tours", params={"tourId": TOUR_ID})
+        assert tour.status_code == 200, "документ тура не появился"
+        found = client.get("/api/tours/search", params={"q": "байконур"}).json()
+        assert [t["id"] for t in found] == [TOUR_ID], "поиск не видит каталог"
+        total = tour.json()["reviews"]["ratingSummary"]["totalReviews"]
+        cards = tour.json()["recommendedCards"]
+        assert len(cards) > 1, "карточки рекомендаций остались пустыми"
+        assert all("rating" in card for card in cards)
+        assert len(client.get("/api/tours/bbox", params=WORLD).json()) == TOURS, (
+            "геоиндекс не видит каталог"
+        )
+        nearby = client.get("/api/tours/nearby", params={"tourId": TOUR_ID}).json()
+        assert nearby, "поиск ближайших туров пуст"
+        print("каталог из другого процесса виден")
+
+        run_in_other_process(CHANGE_TOUR)
+
+        tour = client.get("/api/tours", params={"tourId": TOUR_ID}).json()
+        assert tour["title"] == "Новое название", "документ тура устарел"
+        assert tour["reviews"]["ratingSummary"]["totalReviews"] == total + 1, (
+            "сводка рейтинга устарела"
+        )
+        reviews = client.get("/api/reviews", params={"tourId": TOUR_ID}).json()
+        assert reviews["reviews"][0]["name"] == "Проверка", "страница отзывов устарела"
+        print("изменения тура и отзывов из другого процесса видны")
+
+        run_in_other_process(CHANGE_RECOMMENDATIONS)
+
+        tour = client.get("/api/tours", params={"tourId": TOUR_ID}).json()
+        first = [card["url"] for card in tour["recommendedCards"][:2]]
+        assert first == [cards[1]["url"]] * 2, "рекомендации устарели"
+        print("пересчёт рекомендаций из другого процесса виден")
+
+
+if __name__ == "__main__":
+    main()
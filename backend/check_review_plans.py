@@ -0,0 +1,121 @@
+"""
+Проверка планов запросов страниц отзывов: регрессия индексов
+(сортировка во временном B-дереве, полный просмотр) видна сразу.
+
+Заполняет временную базу SQLite отзывами, собирает страницы через
+build_reviews_page — первую и по курсору — и для каждого выполненного
+SELECT по reviews проверяет EXPLAIN QUERY PLAN: поиск по ожидаемому
+индексу, отсутствие USE TEMP B-TREE и, для страницы по курсору,
+диапазон по индексу.
+
+Запуск: python check_review_plans.py
+"""
+
+import json
+import os
+import random
+import re
+import tempfile
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, event, insert, text
+from sqlalchemy.orm import sessionmaker
+
+from app.api.review import ReviewSort, build_reviews_page
+from app.migrations import migrate
+from app.models import Base, Review, Tour
+
+TOURS = 10
+REVIEWS_PER_TOUR = 500
+TOUR_ID = "tour-0"
+SORTS: tuple[ReviewSort, ...] = ("newest", "oldest", "highest", "lowest")
+
+# (stars, sort, detailed) -> индекс, которым должен обслуживаться запрос
+CASES: dict[tuple[int | None, ReviewSort, bool], str] = {
+    (stars, sort, detailed): (
+        ("ix_reviews_tour_date" if stars is None and sort in ("newest", "oldest")
+         else "ix_reviews_tour_stars")
+        + ("_detailed" if detailed else "")
+    )
+    for stars in (None, 5)
+    for sort in SORTS
+    for detailed in (False, True)
+}
+
+
+def fill(session: sessionmaker):
+    rng = random.Random(1)
+    with session() as db:
+        for t in range(TOURS):
+            db.add(Tour(id=f"tour-{t}", title=f"Тур {t}"))
+        db.flush()
+        db.execute(
+            insert(Review),
+            [
+                {
+                    "tour_id": f"tour-{t}",
+                    "name": "Проверка",
+                    "date": date(2024, 1, 1) + timedelta(days=rng.randrange(700)),
+                    "rating": rng.randint(1, 5),
+                    "text": "x" * rng.choice((50, 400)),
+                }
+                for t in range(TOURS)
+                for _ in range(REVIEWS_PER_TOUR)
+            ],
+        )
+        db.commit()
+        db.execute(text("ANALYZE"))
+
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(), "check_review_plans.db")
+    engine = create_engine(
+        f"sqlite:///{path}", connect_args={"check_same_thread": False}
+    )
+    session = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    Base.metadata.create_all(bind=engine)
+    migrate(engine)
+    fill(session)
+
+    captured: list[tuple[str, tuple]] = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().startswith("SELECT") and "FROM reviews" in statement:
+            captured.append((statement, parameters))
+
+    failures = []
+    with session() as db:
+        for (stars, sort, detailed), index in CASES.items():
+            captured.clear()
+            first = build_reviews_page(
+                db, TOUR_ID, 1, 10, None, stars, sort, detailed
+            )
+            assert first is not None
+            cursor = json.loads(first)["nextCursor"]
+            assert cursor, "у первой страницы нет продолжения"
+            build_reviews_page(db, TOUR_ID, 1, 10, cursor, stars, sort, detailed)
+
+            for statement, parameters in captured:
+                plan = " / ".join(
+                    row[3]
+                    for row in db.connection().exec_driver_sql(
+                        f"EXPLAIN QUERY PLAN {statement}", parameters
+                    )
+                )
+                ok = f"INDEX {index} " in plan and "TEMP B-TREE" not in plan
+                # страница по курсору начинается с позиции в индексе,
+                # а не просматривает группу с начала
+                if statement is not captured[0][0]:
+                    ok = ok and re.search(r"[<>]\(?\?", plan) is not None
+                label = f"stars={stars} sort={sort} detailed={detailed}"
+                print(f"{'ok ' if ok else 'BAD'} {label}: {plan}")
+                if not ok:
+                    failures.append(label)
+
+    assert not failures, f"планы без ожидаемого индекса: {failures}"
+    print(f"планов проверено: {len(CASES) * 2}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Проверка числа SQL-запросов при загрузке тура: регрессия N+1 в
+load_tour_aggregate и build_tour_document видна сразу.
+
+Загружает каталог из tours.json во временную базу SQLite и считает
+выполненные операторы через before_cursor_execute:
+- агрегат тура (тур с booking и группой content) — ровно один SELECT,
+  и обращение к его полям не порождает ленивых загрузок;
+- холодный GET /api/tours — ровно COLD_DOCUMENT_STATEMENTS операторов
+  (агрегат, сводка рейтинга, id рекомендаций, карточки и их рейтинги),
+  а при готовом индексе карточек — COLD_DOCUMENT_WARM_CARDS_STATEMENTS.
+
+Сверка счётчиков кэшей в get_db (app/cache_versions.py) идёт не чаще
+раза в секунду и к сборке документа не относится — её не считаем.
+
+Запуск: python check_tour_queries.py
+"""
+
+import os
+import tempfile
+
+path = os.path.join(tempfile.mkdtemp(), "check_tour_queries.db")
+os.environ["DB__URL"] = f"sqlite:///{path}"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.api.tour import load_tour_aggregate  # noqa: E402
+from app.cache import invalidate_all, invalidate_tour  # noqa: E402
+from app.database import engine, session  # noqa: E402
+from app.models import Tour  # noqa: E402
+from json_db import load_tour_from_json  # noqa: E402
+from main import app  # noqa: E402
+
+# агрегат, сводка рейтинга, id рекомендаций, карточки, рейтинги карточек
+COLD_DOCUMENT_STATEMENTS = 5
+# индекс карточек уже построен: агрегат, сводка рейтинга, id рекомендаций
+COLD_DOCUMENT_WARM_CARDS_STATEMENTS = 3
+
+
+def is_version_sync(statement: str) -> bool:
+    return statement.lstrip().startswith("SELECT name, version FROM cache_versions")
+
+
+def check_aggregate(statements: list[str], tour_ids: list[str]):
+    with session() as db:
+        for tour_id in tour_ids:
+            statements.clear()
+
+            tour = load_tour_aggregate(db, tour_id)
+            assert tour is not None
+            # всё, что читает build_tour_document из агрегата
+            booking = tour.booking
+            _ = (
+                tour.description, tour.included, tour.excluded,
+                tour.what_to_bring, tour.important_info, tour.faq,
+                tour.organizer, tour.images, tour.map_popup,
+                booking.cost, booking.currency, booking.days,
+                booking.prepayment, booking.max_seats,
+            )
+
+            selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+            assert len(statements) == 1 and len(selects) == 1, (
+                f"{tour_id}: {len(statements)} запросов вместо одного:\n"
+                + "\n".join(statements)
+            )
+            db.expunge_all()
+
+
+def check_document(
+    client: TestClient, statements: list[str], tour_id: str, expected: int
+):
+    statements.clear()
+    response = client.get("/api/tours", params={"tourId": tour_id})
+    assert response.status_code == 200, f"{tour_id}: {response.status_code}"
+
+    counted = [s for s in statements if not is_version_sync(s)]
+    assert len(counted) == expected, (
+        f"{tour_id}: {len(counted)} запросов вместо {expected}:\n"
+        + "\n".join(counted)
+    )
+
+
+def main():
+    load_tour_from_json(session(), "tours.json")
+
+    statements: list[str] = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with session() as db:
+        tour_ids = [id for (id,) in db.query(Tour.id)]
+
+    check_aggregate(statements, tour_ids)
+    print(f"туров: {len(tour_ids)}, агрегат каждого — один SELECT")
+
+    with TestClient(app) as client:
+        for tour_id in tour_ids:
+            invalidate_all()
+            check_document(client, statements, tour_id, COLD_DOCUMENT_STATEMENTS)
+        print(f"холодный документ тура — {COLD_DOCUMENT_STATEMENTS} запросов")
+
+        for tour_id in tour_ids:
+            invalidate_tour(tour_id)
+            check_document(
+                client, statements, tour_id, COLD_DOCUMENT_WARM_CARDS_STATEMENTS
+            )
+        print(
+            "документ тура при готовых карточках — "
+            f"{COLD_DOCUMENT_WARM_CARDS_STATEMENTS} запроса"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,9 @@ from app.models.tour import Tour
 from app.models.booking import Booking, BookingDate
 from app.models.base import Base
 from app.models.review import Review
+from app.migrations import migrate
+from app.search import create_search_index, index_tour
+from app.recommend import rebuild_recommendations
 
 # ---------- helpers ----------
 
@@ -134,6 +137,9 @@ def load_reviews(db: Session, tour_id: str, reviews_data: list[dict]):
 
         db.add(review)
 
+    # tour_ratings наполняют триггеры на reviews при flush (app/ratings.py),
+    # кэши работающего API сбрасываются по cache_versions (app/cache_versions.py)
+
 
 def load_tour_from_json(db: Session, json_path: str):
     with open(json_path, "r", encoding="utf-8") as f:
@@ -161,6 +167,9 @@ def load_tour_from_json(db: Session, json_path: str):
             db.add(tour)
             db.flush()  # чтобы появился tour.id
 
+            # поисковый индекс обновляется в той же транзакции
+            index_tour(db, tour)
+
             db.commit()
 
             # ---------- Booking ----------
@@ -210,6 +219,13 @@ def load_tour_from_json(db: Session, json_path: str):
         finally:
             db.close()
 
+    # рекомендации считаются по всему каталогу
+    rebuild_recommendations(db)
+    db.close()
+
+    # кэши каталога в процессе API сбросятся по счётчику cache_versions,
+    # который увеличили триггеры на tours и bookings
+
 
 # --------
 
@@ -427,6 +443,8 @@ if __name__ == "__main__":
     db = sessionmaker(bind=engine, autoflush=False, autocommit=False)()
 
     Base.metadata.create_all(bind=engine)
+    migrate(engine)
+    create_search_index(engine)
 
     load_tour_from_json(db, "tours.json")
 
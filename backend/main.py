@@ -3,8 +3,11 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.api import router
 
-from app.database import engine
+from app.database import engine, session
+from app.holds import hold_sweeper
+from app.migrations import migrate
 from app.models import Base
+from app.search import create_search_index, sync_search_index
 
 
 app = FastAPI(title="KazWonder API")
@@ -19,6 +22,14 @@ app.add_middleware(
 )
 
 Base.metadata.create_all(bind=engine)
+migrate(engine)
+create_search_index(engine)
+
+with session() as db:
+    sync_search_index(db)
+
+# возвращает места броней, истёкших в том числе до перезапуска
+hold_sweeper.start()
 
 
 @app.get("/")
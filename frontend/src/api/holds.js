@@ -0,0 +1,26 @@
+import { getToken } from "../utils/auth";
+
+// Временная бронь мест на время оформления заказа (истекает на сервере)
+export async function createHold(bookingDateId, seats) {
+  const response = await fetch("/api/holds", {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+      Authorization: `Bearer ${getToken()}`,
+    },
+    body: JSON.stringify({ booking_date_id: bookingDateId, seats }),
+  });
+  const data = await response.json();
+  if (!response.ok) throw new Error(data.detail || "Не удалось забронировать места");
+
+  return data;
+}
+
+export function cancelHold(holdId) {
+  // keepalive: запрос должен уйти и при закрытии страницы
+  return fetch(`/api/holds/${holdId}`, {
+    method: "DELETE",
+    headers: { Authorization: `Bearer ${getToken()}` },
+    keepalive: true,
+  }).catch(() => {});
+}
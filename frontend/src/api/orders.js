@@ -0,0 +1,24 @@
+import { getToken } from "../utils/auth";
+
+// Сетевые сбои повторяем с тем же Idempotency-Key — сервер вернёт
+// результат первой попытки, если она всё-таки дошла
+const ORDER_RETRIES = 2;
+
+export async function postOrder(body, idempotencyKey) {
+  for (let attempt = 0; ; attempt++) {
+    try {
+      return await fetch("/api/orders", {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+          Authorization: `Bearer ${getToken()}`,
+          "Idempotency-Key": idempotencyKey,
+        },
+        body,
+      });
+    } catch (err) {
+      if (attempt >= ORDER_RETRIES) throw err;
+      await new Promise((resolve) => setTimeout(resolve, 1000 * 2 ** attempt));
+    }
+  }
+}
@@ -0,0 +1,19 @@
+// Статичный документ тура кэшируется надолго, места по датам — отдельно
+export async function fetchAvailability(tourId) {
+  const response = await fetch(`/api/tours/availability?tourId=${tourId}`);
+  if (!response.ok) throw new Error("Не удалось загрузить даты тура");
+
+  const data = await response.json();
+  return data.dates;
+}
+
+export async function fetchTour(tourId) {
+  const [tourRes, dates] = await Promise.all([
+    fetch(`/api/tours?tourId=${tourId}`),
+    fetchAvailability(tourId),
+  ]);
+  if (!tourRes.ok) throw new Error("Tour not found");
+
+  const tour = await tourRes.json();
+  return { ...tour, booking: { ...tour.booking, dates } };
+}
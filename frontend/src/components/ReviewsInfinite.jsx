@@ -6,6 +6,7 @@ import { faStar as faStarRegular } from "@fortawesome/free-regular-svg-icons";
 export function ReviewsInfinite(props) {
   const [allReviews, setAllReviews] = useState([]);
   const [currentPage, setCurrentPage] = useState(1);
+  const [nextCursor, setNextCursor] = useState(null);
   const [hasMore, setHasMore] = useState(true);
   const [isLoading, setIsLoading] = useState(false);
   const [isInitialLoading, setIsInitialLoading] = useState(true);
@@ -29,6 +30,7 @@ export function ReviewsInfinite(props) {
         if (data.reviews) {
           setAllReviews(data.reviews);
           setHasMore(data.hasMore ?? data.reviews.length > 0);
+          setNextCursor(data.nextCursor ?? null);
         } else {
           // Если API возвращает просто массив отзывов
           setAllReviews(data);
@@ -53,7 +55,12 @@ export function ReviewsInfinite(props) {
     try {
       setIsLoading(true);
       const nextPage = currentPage + 1;
-      const response = await fetch(`${url}&page=${nextPage}`);
+      // курсор не сбивается, если между запросами добавились отзывы
+      const response = await fetch(
+        nextCursor
+          ? `${url}&cursor=${encodeURIComponent(nextCursor)}`
+          : `${url}&page=${nextPage}`
+      );
 
       if (!response.ok) throw new Error("Ошибка при загрузке отзывов");
 
@@ -63,6 +70,7 @@ export function ReviewsInfinite(props) {
       if (data.reviews) {
         setAllReviews((prev) => [...prev, ...data.reviews]);
         setHasMore(data.hasMore ?? false);
+        setNextCursor(data.nextCursor ?? null);
       } else {
         setAllReviews((prev) => [...prev, ...data]);
         // Если вернулось меньше отзывов или пусто - больше страниц нет
@@ -1,9 +1,12 @@
-import { useState, useEffect, useMemo, useCallback } from "react";
+import { useState, useEffect, useMemo, useCallback, useRef } from "react";
 import { useLocation, useNavigate, useParams } from "react-router-dom";
 import NotFoundPage from "../components/NotFound";
 import LoadingPage from "../components/LoadingPage";
 import { FontAwesomeIcon } from "@fortawesome/react-fontawesome";
 import { getToken } from "../utils/auth";
+import { fetchAvailability, fetchTour } from "../api/tours";
+import { cancelHold, createHold } from "../api/holds";
+import { postOrder } from "../api/orders";
 import {
   faChevronRight,
   faClock,
@@ -490,8 +493,7 @@ export default function Booking() {
       setLoading(false);
       return;
     }
-    fetch(`/api/tours?tourId=${tourId}`)
-      .then((res) => res.json())
+    fetchTour(tourId)
       .then(setTour)
       .catch(() => {})
       .finally(() => setLoading(false));
@@ -568,6 +570,13 @@ function BookingDetail({
   const [orderNumber, setOrderNumber] = useState("");
   const [submitError, setSubmitError] = useState("");
 
+  // Бронь мест на время оформления
+  const [holdId, setHoldId] = useState(null);
+
+  // Ключ идемпотентности: повтор того же заказа (сеть оборвалась, кнопку
+  // нажали ещё раз) получает тот же ключ, и сервер не создаст второй заказ
+  const idempotencyRef = useRef({ body: null, key: null });
+
   // Проверка авторизации
   useEffect(() => {
     const checkAuth = () => {
@@ -613,6 +622,41 @@ function BookingDetail({
     participants,
   ]);
 
+  // Держим места за пользователем, пока он заполняет форму. Повторный
+  // запрос на ту же дату заменяет бронь, а не создаёт новую.
+  useEffect(() => {
+    if (!isAuthenticated) return;
+
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const hold = await createHold(currentDate.id, participants);
+        if (!cancelled) {
+          setHoldId(hold.hold_id);
+          setSubmitError("");
+        }
+      } catch (err) {
+        if (!cancelled) {
+          setHoldId(null);
+          setSubmitError(err.message);
+        }
+      }
+    }, 400);
+
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [isAuthenticated, currentDate.id, participants]);
+
+  // Бронь другой даты или при уходе со страницы снимаем сразу
+  useEffect(() => {
+    if (!holdId) return;
+    return () => {
+      cancelHold(holdId);
+    };
+  }, [holdId]);
+
   // Генерация путешественников
   useEffect(() => {
     setTravelers(
@@ -731,6 +775,23 @@ function BookingDetail({
 
     setIsProcessing(true);
 
+    // Без брони перед оплатой обновляем места по выбранной дате
+    // (забронированные места в остатке уже не видны)
+    if (!holdId) {
+      try {
+        const freshDates = await fetchAvailability(tourId);
+        const freshDate = freshDates.find((d) => d.id === currentDate.id);
+        if (!freshDate || freshDate.seats < participants) {
+          setMaxSeats(freshDate?.seats ?? 0);
+          setSubmitError("Недостаточно свободных мест");
+          setIsProcessing(false);
+          return;
+        }
+      } catch {
+        // окончательную проверку мест выполнит сервер при создании заказа
+      }
+    }
+
     // Основной путешественник
     const mainTraveler = {
       firstName: primary.firstName,
@@ -757,6 +818,7 @@ function BookingDetail({
       participants_count: participants,
       primary_traveler: mainTraveler,
       additional_travelers: additionalTravelers,
+      hold_id: holdId,
     };
 
     // Имитация обработки платежа
@@ -766,14 +828,12 @@ function BookingDetail({
       const token = getToken();
       if (!token) return null;
 
-      const response = await fetch("/api/orders", {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-          Authorization: `Bearer ${token}`,
-        },
-        body: JSON.stringify(orderData),
-      });
+      const body = JSON.stringify(orderData);
+      if (idempotencyRef.current.body !== body) {
+        idempotencyRef.current = { body, key: crypto.randomUUID() };
+      }
+
+      const response = await postOrder(body, idempotencyRef.current.key);
 
       if (!response.ok) {
         const errorData = await response.json();
@@ -1,4 +1,4 @@
-import { useState, useEffect } from "react";
+import { useState, useEffect, useCallback } from "react";
 import { useNavigate } from "react-router-dom";
 import { FontAwesomeIcon } from "@fortawesome/react-fontawesome";
 import { getToken } from "../utils/auth";
@@ -299,72 +299,57 @@ const OrderCard = ({ order, tourData }) => {
 export default function Orders() {
   const navigate = useNavigate();
   const [orders, setOrders] = useState([]);
-  const [toursData, setToursData] = useState({});
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [error, setError] = useState(null);
 
-  useEffect(() => {
-    const fetchOrders = async () => {
-      try {
-        const token = getToken();
-        if (!token) {
+  // Страница истории заказов: название, фото и даты тура приходят вместе
+  // с заказом, отдельные запросы за турами не нужны
+  const fetchOrdersPage = useCallback(
+    async (cursor) => {
+      const token = getToken();
+      if (!token) {
+        navigate("/login", {
+          replace: true,
+          state: { redirectUrl: "/orders" },
+        });
+        return null;
+      }
+
+      const params = new URLSearchParams({ limit: "20" });
+      if (cursor) params.set("cursor", cursor);
+
+      const response = await fetch(`/api/orders?${params}`, {
+        headers: {
+          Authorization: `Bearer ${token}`,
+        },
+      });
+
+      if (!response.ok) {
+        if (response.status === 401) {
           navigate("/login", {
             replace: true,
             state: { redirectUrl: "/orders" },
           });
-          return;
+          return null;
         }
+        throw new Error("Не удалось загрузить заказы");
+      }
 
-        const response = await fetch("/api/orders", {
-          headers: {
-            Authorization: `Bearer ${token}`,
-          },
-        });
+      return response.json();
+    },
+    [navigate]
+  );
 
-        if (!response.ok) {
-          if (response.status === 401) {
-            navigate("/login", {
-              replace: true,
-              state: { redirectUrl: "/orders" },
-            });
-            return;
-          }
-          throw new Error("Не удалось загрузить заказы");
-        }
+  useEffect(() => {
+    const fetchOrders = async () => {
+      try {
+        const page = await fetchOrdersPage(null);
+        if (!page) return;
 
-        const ordersData = await response.json();
-        setOrders(ordersData);
-
-        // Загружаем данные о турах
-        const uniqueTourIds = [...new Set(ordersData.map((o) => o.tour_id))];
-        const toursMap = {};
-
-        await Promise.all(
-          uniqueTourIds.map(async (tourId) => {
-            try {
-              const tourRes = await fetch(`/api/tours?tourId=${tourId}`);
-              if (tourRes.ok) {
-                const tour = await tourRes.json();
-                const bookingDate = tour.booking?.dates?.find(
-                  (d) =>
-                    d.id ===
-                    ordersData.find((o) => o.tour_id === tourId)
-                      ?.booking_date_id
-                );
-
-                toursMap[tourId] = {
-                  title: tour.title,
-                  image: tour.images?.[0],
-                  dateRange: bookingDate?.range,
-                };
-              }
-            } catch (err) {
-              console.error(`Error loading tour ${tourId}:`, err);
-            }
-          })
-        );
-
-        setToursData(toursMap);
+        setOrders(page.items);
+        setNextCursor(page.nextCursor);
       } catch (err) {
         setError(err.message);
       } finally {
@@ -373,7 +358,24 @@ export default function Orders() {
     };
 
     fetchOrders();
-  }, [navigate]);
+  }, [fetchOrdersPage]);
+
+  const handleLoadMore = async () => {
+    if (isLoadingMore || !nextCursor) return;
+
+    try {
+      setIsLoadingMore(true);
+      const page = await fetchOrdersPage(nextCursor);
+      if (!page) return;
+
+      setOrders((prev) => [...prev, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      setError(err.message);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
 
   if (loading) return <LoadingPage />;
 
@@ -439,9 +441,27 @@ export default function Orders() {
               <OrderCard
                 key={order.id}
                 order={order}
-                tourData={toursData[order.tour_id]}
+                tourData={{
+                  title: order.tour_title,
+                  image: order.tour_img,
+                  dateRange: order.date_range,
+                }}
               />
             ))}
+
+            {nextCursor && (
+              <div className="flex justify-center">
+                <button
+                  onClick={handleLoadMore}
+                  disabled={isLoadingMore}
+                  className={`px-6 py-3 rounded-xl font-semibold text-white bg-linear-to-r from-lime-green to-sage-green dark:from-blue-400 dark:to-blue-600 hover:shadow-lg transition-all duration-200 ${
+                    isLoadingMore ? "opacity-70 cursor-wait" : ""
+                  }`}
+                >
+                  {isLoadingMore ? "Загружаем..." : "Показать ещё"}
+                </button>
+              </div>
+            )}
           </div>
         )}
       </div>
@@ -21,6 +21,7 @@ import { ReviewsInfinite } from "../components/ReviewsInfinite";
 import NotFoundPage from "../components/NotFound";
 import LoadingPage from "../components/LoadingPage";
 import MapComponent from "../components/MapComponent";
+import { fetchTour } from "../api/tours";
 
 export default function Tours() {
   const { tourId } = useParams();
@@ -34,11 +35,7 @@ export default function Tours() {
 
     if (!tourId) return;
 
-    fetch(`/api/tours?tourId=${tourId}`)
-      .then((res) => {
-        if (!res.ok) throw new Error("Tour not found");
-        return res.json();
-      })
+    fetchTour(tourId)
       .then((data) => {
         setTour(data);
         setLoading(false);